@@ -3,14 +3,165 @@ Database Management Module
 Handles local data storage using TinyDB for simplicity and portability.
 """
 
+import atexit
+import bisect
 import json
 import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime, timedelta
 from pathlib import Path
-from tinydb import TinyDB, Query
-from tinydb.storages import JSONStorage
+from tinydb import TinyDB
+from tinydb.table import Document, Table
+from tinydb.storages import JSONStorage, Storage, touch
 from tinydb.middlewares import CachingMiddleware
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib-backed JSONStorage
+    orjson = None
+
+# Counter fields kept per task in daily_stats
+STAT_COUNT_FIELDS = ('ok_count', 'skip_count', 'busy_count', 'total_count')
+
+# Query results TinyDB keeps per table before evicting the oldest
+QUERY_CACHE_SIZE = 32
+
+# Writes buffered by CachingMiddleware before it rewrites the JSON file on its own.
+# Lifecycle boundaries (close, archive) and the periodic flush below write earlier,
+# so an unclean shutdown loses at most FLUSH_INTERVAL_SECONDS worth of events.
+WRITE_CACHE_SIZE = 1000
+FLUSH_INTERVAL_SECONDS = 30
+
+# Grace period past midnight before cached insights expire on their own
+INSIGHTS_CACHE_GRACE = timedelta(minutes=5)
+
+# Seconds a get_recent_responses result is reused when nothing was written
+RECENT_CACHE_TTL = 30
+
+# Records passed to queue_record() are inserted together once this many are
+# waiting or this many seconds have passed since the last batch
+PENDING_BATCH_SIZE = 20
+PENDING_FLUSH_SECONDS = 5
+
+# Values of the task_kind field stored on every reminder record
+TASK_KIND_NORMAL = 0
+TASK_KIND_RESCHEDULED = 1
+TASK_KIND_MOTIVATIONAL = 2
+
+@lru_cache(maxsize=None)
+def task_kind(task_name):
+    """Classify a task name into a TASK_KIND_* value (cached per name)"""
+    if task_name.endswith('_rescheduled'):
+        return TASK_KIND_RESCHEDULED
+    if task_name == 'motivational_intervention':
+        return TASK_KIND_MOTIVATIONAL
+    return TASK_KIND_NORMAL
+
+def _record_kind(record):
+    """task_kind of a reminder record, derived from the name for rows written without it"""
+    kind = record.get('task_kind')
+    return task_kind(record['task_name']) if kind is None else kind
+
+def _dumps(data):
+    """Serialize to compact UTF-8 JSON bytes, using orjson when available"""
+    if orjson:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+def _loads(data):
+    """Parse JSON bytes, using orjson when available"""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def stats_doc_id(date):
+    """Stable daily_stats doc_id for a YYYY-MM-DD date (e.g. 20240131)"""
+    return int(date.replace('-', ''))
+
+class ORJSONStorage(Storage):
+    """TinyDB storage that reads and writes the JSON file with orjson"""
+    
+    def __init__(self, path, create_dirs=False, access_mode='rb+'):
+        super().__init__()
+        touch(path, create_dirs=create_dirs)
+        self._handle = open(path, mode=access_mode)
+    
+    def read(self):
+        # An empty file means an empty database
+        self._handle.seek(0, os.SEEK_END)
+        if not self._handle.tell():
+            return None
+        
+        self._handle.seek(0)
+        return orjson.loads(self._handle.read())
+    
+    def write(self, data):
+        # orjson produces UTF-8 bytes directly, no separate encode step
+        self._handle.seek(0)
+        self._handle.write(orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE))
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._handle.truncate()
+    
+    def close(self):
+        self._handle.close()
+
+class _IntKeyView(MutableMapping):
+    """Int-keyed view over a table's raw str-keyed dict, so updaters edit it in place"""
+    
+    __slots__ = ('_raw', '_id_class')
+    
+    def __init__(self, raw, id_class):
+        self._raw = raw
+        self._id_class = id_class
+    
+    def __getitem__(self, doc_id):
+        return self._raw[str(doc_id)]
+    
+    def __setitem__(self, doc_id, document):
+        self._raw[str(doc_id)] = document
+    
+    def __delitem__(self, doc_id):
+        del self._raw[str(doc_id)]
+    
+    def __contains__(self, doc_id):
+        return str(doc_id) in self._raw
+    
+    def __iter__(self):
+        return map(self._id_class, self._raw)
+    
+    def __len__(self):
+        return len(self._raw)
+    
+    def clear(self):
+        self._raw.clear()
+
+class InPlaceTable(Table):
+    """Table whose writes skip TinyDB's full doc_id conversion round-trip
+    
+    The stock _update_table rebuilds the whole table twice per write
+    (str -> document_id_class and back, TinyDB issue #480). Here the updater
+    works through _IntKeyView, so an insert only touches its own key.
+    """
+    
+    def _update_table(self, updater):
+        tables = self._storage.read()
+        if tables is None:
+            tables = {}
+        
+        raw_table = tables.setdefault(self.name, {})
+        updater(_IntKeyView(raw_table, self.document_id_class))
+        
+        self._storage.write(tables)
+        self.clear_cache()
+
+class WellnessTinyDB(TinyDB):
+    table_class = InPlaceTable
+
 class DatabaseManager:
     def __init__(self, db_path="data/wellness_reminders.json"):
         # Handle both absolute and relative paths robustly
@@ -24,25 +175,366 @@ class DatabaseManager:
         
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Use caching middleware for better performance
-        self.db = TinyDB(
-            self.db_path,
-            storage=CachingMiddleware(JSONStorage)
-        )
+        # Append-only log of reminder inserts not yet flushed into the JSON file
+        self.wal_path = self.db_path.with_suffix('.jsonl')
+        
+        # Use caching middleware for better performance; writes are batched
+        # in memory and flushed on lifecycle boundaries or by the flush thread
+        storage = CachingMiddleware(ORJSONStorage if orjson else JSONStorage)
+        storage.WRITE_CACHE_SIZE = WRITE_CACHE_SIZE
+        self.db = WellnessTinyDB(self.db_path, storage=storage)
+        self._lock = threading.RLock()
         
         # Define tables
-        self.reminders_table = self.db.table('reminders')
+        self.reminders_table = self.db.table('reminders', cache_size=QUERY_CACHE_SIZE)
         self.daily_stats_table = self.db.table('daily_stats')
-        self.settings_table = self.db.table('settings')
+        self.settings_table = self.db.table('settings', cache_size=QUERY_CACHE_SIZE)
+        
+        # In-memory secondary indexes over reminders_table (doc_ids only),
+        # so per-day lookups don't need a full table scan
+        self._by_date = defaultdict(list)
+        # (timestamp, doc_id) pairs kept sorted for range lookups by time
+        self._timestamps = []
+        # Unresolved 'busy' responses: doc_id -> (task_name, timestamp)
+        self._pending_busy = {}
+        # Skips per date (rescheduled reminders excluded), kept by _index_reminder
+        self._skips_by_date = Counter()
+        
+        # Running count of today's consecutive skips, updated on every insert
+        self._consec_date = None
+        self._consec_skips = 0
+        
+        # daily_stats lives in memory as {date: {task_name: row}} and is
+        # persisted lazily by flush(); changed dates are dirty. Each day is a
+        # single {'date', 'tasks': {task_name: counters}} document stored
+        # under stats_doc_id(date), so upserts need no search
+        self._stats = {}
+        # Sorted list of the dates in self._stats, for bisecting date ranges
+        self._stats_dates = []
+        self._dirty_stats = set()
+        
+        # Settings are read from memory; TinyDB is write-through storage
+        self._settings = {}
+        self._settings_doc_id = None
+        
+        # Read caches, invalidated by every write through _invalidate_caches()
+        self._stats_cache = {}
+        self._insights_cache = None
+        self._insights_dirty = True
+        self._insights_cached_until = None
+        # Write generation, bumped by _invalidate_caches(); cached reads
+        # made under an older generation are stale
+        self._cache_gen = 0
+        # hours -> (generation, expiry on the monotonic clock, rows)
+        self._recent_cache = {}
+        
+        # Low-priority records waiting for flush_pending() to insert them
+        self._pending_records = deque()
+        self._pending_flushed_at = time.monotonic()
+        
+        # Nesting depth of batch(); flushes requested inside one run once at the end
+        self._batch_depth = 0
+        self._flush_deferred = False
+        
+        self._load_stats()
+        self._load_settings()
+        self._replay_wal()
+        self._build_reminder_indexes()
+        
+        # Replayed records are now in the cache; flushing writes them out and empties the log
+        self._wal = open(self.wal_path, 'ab')
+        # Set by close(); later flushes and close() calls do nothing
+        self._closed = False
+        self.flush()
+        
+        # Periodically write buffered changes to disk
+        self._flush_stop = threading.Event()
+        self._flush_thread = threading.Thread(target=self._periodic_flush, daemon=True)
+        self._flush_thread.start()
+        atexit.register(self.flush_pending)
         
         logging.info(f"Database initialized at {self.db_path}")
 
+    def _periodic_flush(self):
+        """Flush buffered writes every FLUSH_INTERVAL_SECONDS until closed"""
+        while not self._flush_stop.wait(FLUSH_INTERVAL_SECONDS):
+            self.flush()
+
+    @contextmanager
+    def batch(self):
+        """Group several writes so they reach disk in a single flush"""
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._flush_deferred:
+                    self._flush_deferred = False
+                    self.flush()
+
+    def flush(self):
+        """Write any buffered changes to disk"""
+        try:
+            with self._lock:
+                if self._closed:
+                    return
+                if self._batch_depth:
+                    self._flush_deferred = True
+                    return
+                self.flush_pending()
+                self._flush_stats()
+                self.db.storage.flush()
+                # Everything in the log is now in the JSON file
+                self._wal.truncate(0)
+        except Exception as e:
+            logging.error(f"Error flushing database: {e}")
+
+    def _replay_wal(self):
+        """Merge reminder records from the log that never reached the JSON file"""
+        if not self.wal_path.exists():
+            return
+        
+        replayed = 0
+        with open(self.wal_path, 'rb') as f:
+            for line in f:
+                try:
+                    entry = _loads(line)
+                except ValueError:
+                    # A torn final line from an unclean shutdown
+                    continue
+                
+                doc_id, record = entry['doc_id'], entry['record']
+                if self.reminders_table.contains(doc_id=doc_id):
+                    continue
+                
+                self.reminders_table.insert(Document(record, doc_id=doc_id))
+                if _record_kind(record) != TASK_KIND_MOTIVATIONAL:
+                    self.update_daily_stats(record['task_name'], record['response_type'],
+                                            record['date'], record['timestamp'])
+                replayed += 1
+        
+        if replayed:
+            logging.info(f"Replayed {replayed} reminder records from {self.wal_path}")
+
+    def _load_stats(self):
+        """Load daily_stats documents into the in-memory counters"""
+        self._stats.clear()
+        self._dirty_stats.clear()
+        legacy_ids = []
+        for doc in self.daily_stats_table.all():
+            date = doc['date']
+            day_stats = self._stats.setdefault(date, {})
+            if 'tasks' in doc:
+                for task_name, counters in doc['tasks'].items():
+                    day_stats[task_name] = {'date': date, 'task_name': task_name, **counters}
+            else:
+                # Older per-task rows are folded into their day's document on the next flush
+                day_stats[doc['task_name']] = dict(doc)
+                legacy_ids.append(doc.doc_id)
+                self._dirty_stats.add(date)
+        
+        self._stats_dates = sorted(self._stats)
+        
+        if legacy_ids:
+            self.daily_stats_table.remove(doc_ids=legacy_ids)
+
+    def _flush_stats(self):
+        """Upsert the documents of changed days into TinyDB"""
+        with self._lock:
+            for date in self._dirty_stats:
+                day_stats = self._stats.get(date)
+                if day_stats is None:
+                    continue
+                
+                doc = {
+                    'date': date,
+                    'tasks': {
+                        task_name: {k: v for k, v in row.items() if k not in ('date', 'task_name')}
+                        for task_name, row in day_stats.items()
+                    }
+                }
+                doc_id = stats_doc_id(date)
+                if self.daily_stats_table.contains(doc_id=doc_id):
+                    self.daily_stats_table.update(doc, doc_ids=[doc_id])
+                else:
+                    self.daily_stats_table.insert(Document(doc, doc_id=doc_id))
+            
+            self._dirty_stats.clear()
+
+    def _drop_stats(self, dates):
+        """Remove the given dates from the in-memory and stored daily_stats"""
+        dates = set(dates)
+        self.daily_stats_table.remove(
+            doc_ids=[stats_doc_id(date) for date in dates
+                     if self.daily_stats_table.contains(doc_id=stats_doc_id(date))]
+        )
+        for date in dates:
+            self._stats.pop(date, None)
+        self._stats_dates = [date for date in self._stats_dates if date not in dates]
+        self._dirty_stats -= dates
+
+    def _load_settings(self):
+        """Load all settings documents into a single in-memory dict"""
+        self._settings.clear()
+        self._settings_doc_id = None
+        for doc in self.settings_table.all():
+            self._settings.update(doc)
+            # The document holding last_reset_date is the one updates go to
+            if self._settings_doc_id is None and 'last_reset_date' in doc:
+                self._settings_doc_id = doc.doc_id
+
+    def _build_reminder_indexes(self):
+        """Rebuild the in-memory reminder indexes from the table contents"""
+        self._by_date.clear()
+        self._timestamps.clear()
+        self._pending_busy.clear()
+        self._skips_by_date.clear()
+        for doc in self.reminders_table.all():
+            self._index_reminder(doc.doc_id, doc)
+        
+        self._consec_date = datetime.now().strftime('%Y-%m-%d')
+        self._consec_skips = self._count_consecutive_skips(self._consec_date)
+
+    def _index_reminder(self, doc_id, record):
+        """Add a single reminder document to the in-memory indexes"""
+        self._by_date[record['date']].append(doc_id)
+        # Records arrive in timestamp order, so this is almost always an append
+        bisect.insort(self._timestamps, (record['timestamp'], doc_id))
+        if record['response_type'] == 'busy' and record.get('final_status') == 'pending':
+            self._pending_busy[doc_id] = (record['task_name'], record['timestamp'])
+        elif record['response_type'] == 'skip' and _record_kind(record) != TASK_KIND_RESCHEDULED:
+            self._skips_by_date[record['date']] += 1
+
+    def _count_consecutive_skips(self, date):
+        """Count the trailing run of skips on a date by scanning its reminders"""
+        responses = [
+            r for r in self._get_reminders(self._by_date.get(date))
+            if _record_kind(r) == TASK_KIND_NORMAL
+        ]
+        
+        # Sort by timestamp descending (most recent first)
+        responses.sort(key=lambda x: x['timestamp'], reverse=True)
+        
+        consecutive_skips = 0
+        for response in responses:
+            if response['response_type'] == 'skip':
+                consecutive_skips += 1
+            else:
+                break
+        
+        return consecutive_skips
+
+    def _track_consecutive_skips(self, record):
+        """Update the running consecutive-skip count for a newly inserted record"""
+        if _record_kind(record) != TASK_KIND_NORMAL:
+            return
+        
+        if record['date'] != self._consec_date:
+            self._consec_date = record['date']
+            self._consec_skips = 0
+        
+        if record['response_type'] == 'skip':
+            self._consec_skips += 1
+        else:
+            self._consec_skips = 0
+
+    def _unindex_dates(self, dates):
+        """Drop all index entries for the given dates"""
+        dates = set(dates)
+        if self._consec_date in dates:
+            self._consec_skips = 0
+        removed_ids = set()
+        for date in dates:
+            removed_ids.update(self._by_date.pop(date, ()))
+            self._skips_by_date.pop(date, None)
+        if removed_ids:
+            self._timestamps = [entry for entry in self._timestamps if entry[1] not in removed_ids]
+            for doc_id in removed_ids:
+                self._pending_busy.pop(doc_id, None)
+
+    def _get_reminders(self, doc_ids):
+        """Fetch reminder documents by their doc_ids"""
+        if not doc_ids:
+            return []
+        # get(doc_ids=...) walks the whole table; per-id lookups are dict hits
+        get = self.reminders_table.get
+        return [doc for doc in (get(doc_id=doc_id) for doc_id in doc_ids) if doc is not None]
+
+    def _invalidate_caches(self):
+        """Drop cached aggregates after a write"""
+        self._stats_cache.clear()
+        self._insights_dirty = True
+        self._cache_gen += 1
+
+    def record_response(self, record):
+        """Insert a reminder record and keep the in-memory indexes in sync"""
+        record.setdefault('task_kind', task_kind(record['task_name']))
+        with self._lock:
+            doc_id = self.reminders_table.insert(record)
+            self._after_insert([doc_id], [record])
+        return doc_id
+
+    def queue_record(self, record):
+        """Queue a reminder record to be inserted with the next batch"""
+        record.setdefault('task_kind', task_kind(record['task_name']))
+        self._pending_records.append(record)
+        if (len(self._pending_records) >= PENDING_BATCH_SIZE
+                or time.monotonic() - self._pending_flushed_at > PENDING_FLUSH_SECONDS):
+            self.flush_pending()
+
+    def flush_pending(self):
+        """Insert all queued records in one batch and return their doc_ids"""
+        try:
+            with self._lock:
+                if self._closed:
+                    return []
+                self._pending_flushed_at = time.monotonic()
+                records = []
+                while self._pending_records:
+                    records.append(self._pending_records.popleft())
+                if not records:
+                    return []
+                
+                doc_ids = self.reminders_table.insert_multiple(records)
+                self._after_insert(doc_ids, records)
+                return doc_ids
+        except Exception as e:
+            logging.error(f"Error writing queued records: {e}")
+            return []
+
+    def _after_insert(self, doc_ids, records):
+        """Log and index freshly inserted reminder records"""
+        # One appended line per event instead of rewriting the whole JSON file
+        self._wal.write(b''.join(
+            _dumps({'doc_id': doc_id, 'record': record}) + b'\n'
+            for doc_id, record in zip(doc_ids, records)
+        ))
+        self._wal.flush()
+        for doc_id, record in zip(doc_ids, records):
+            self._index_reminder(doc_id, record)
+            self._track_consecutive_skips(record)
+        self._invalidate_caches()
+
     def clear_all_data(self):
         """Truncate all tables for a fresh start."""
         try:
             self.reminders_table.truncate()
             self.daily_stats_table.truncate()
             self.settings_table.truncate()
+            self._settings.clear()
+            self._settings_doc_id = None
+            self._by_date.clear()
+            self._timestamps.clear()
+            self._pending_busy.clear()
+            self._pending_records.clear()
+            self._skips_by_date.clear()
+            self._consec_skips = 0
+            self._stats.clear()
+            self._stats_dates.clear()
+            self._dirty_stats.clear()
+            self._invalidate_caches()
+            self.flush()
             logging.info("All database tables have been cleared.")
         except Exception as e:
             logging.error(f"Error clearing all data from database: {e}")
@@ -51,12 +543,15 @@ class DatabaseManager:
         """Initialize database with default settings if needed"""
         try:
             # Check if settings exist, if not create defaults
-            if not self.settings_table.all():
-                self.settings_table.insert({
-                    'last_reset_date': datetime.now().strftime('%Y-%m-%d'),
+            if not self._settings:
+                now = datetime.now()
+                defaults = {
+                    'last_reset_date': now.strftime('%Y-%m-%d'),
                     'app_version': '1.0.0',
-                    'created_at': datetime.now().isoformat()
-                })
+                    'created_at': now.isoformat()
+                }
+                self._settings_doc_id = self.settings_table.insert(defaults)
+                self._settings.update(defaults)
             
             logging.info("Database initialization completed")
             
@@ -64,70 +559,78 @@ class DatabaseManager:
             logging.error(f"Error initializing database: {e}")
             raise
     
-    def log_reminder_response(self, reminder_type, response_type, delay_minutes=0, rescheduled_time=None):
+    def log_reminder_response(self, reminder_type, response_type, delay_minutes=0, rescheduled_time=None,
+                              responded_at=None):
         """Log a reminder response to the database"""
         try:
-            current_time = datetime.now()
+            current_time = responded_at or datetime.now()
+            iso = current_time.isoformat()
+            today = current_time.strftime('%Y-%m-%d')
             
             record = {
                 'task_name': reminder_type,
-                'original_time': current_time.isoformat(),
+                'original_time': iso,
                 'response_type': response_type,  # 'ok', 'busy', 'skip'
                 'delay_minutes': delay_minutes,
                 'rescheduled_time': rescheduled_time.isoformat() if rescheduled_time else None,
                 'final_status': 'completed' if response_type == 'ok' else 'pending' if response_type == 'busy' else 'skipped',
-                'timestamp': current_time.isoformat(),
-                'date': current_time.strftime('%Y-%m-%d')
+                'timestamp': iso,
+                'date': today
             }
             
-            self.reminders_table.insert(record)
-            
-            # Update daily statistics
-            self.update_daily_stats(reminder_type, response_type)
+            with self._lock:
+                self.record_response(record)
+                
+                # Update daily statistics
+                self.update_daily_stats(reminder_type, response_type, today, iso)
             
             logging.info(f"Logged reminder response: {reminder_type} - {response_type}")
             
         except Exception as e:
             logging.error(f"Error logging reminder response: {e}")
     
-    def update_daily_stats(self, reminder_type, response_type):
+    def log_many(self, responses):
+        """Log a batch of log_reminder_response argument tuples under one lock"""
+        with self._lock:
+            for response in responses:
+                self.log_reminder_response(*response)
+    
+    def update_daily_stats(self, reminder_type, response_type, today=None, iso=None):
         """Update daily statistics for the reminder"""
         try:
-            today = datetime.now().strftime('%Y-%m-%d')
-            
-            # Query for today's stats
-            DailyStats = Query()
-            existing_stats_list = self.daily_stats_table.search(
-                (DailyStats.date == today) & (DailyStats.task_name == reminder_type)
-            )
-            
-            if existing_stats_list:
-                # Update existing record
-                existing_stats = existing_stats_list[0]
-                doc_id_to_update = existing_stats.doc_id
-                
-                # Prepare the data to update
-                update_data = {
-                    f'{response_type}_count': existing_stats.get(f'{response_type}_count', 0) + 1,
-                    'total_count': existing_stats.get('total_count', 0) + 1,
-                    'last_updated': datetime.now().isoformat()
-                }
+            if today is None or iso is None:
+                now = datetime.now()
+                today = now.strftime('%Y-%m-%d')
+                iso = now.isoformat()
+            
+            with self._lock:
+                day_stats = self._stats.get(today)
+                if day_stats is None:
+                    day_stats = self._stats[today] = {}
+                    bisect.insort(self._stats_dates, today)
+                stats = day_stats.get(reminder_type)
                 
-                self.daily_stats_table.update(update_data, doc_ids=[doc_id_to_update])
-            else:
-                # Create new record
-                stats = {
-                    'date': today,
-                    'task_name': reminder_type,
-                    'ok_count': 1 if response_type == 'ok' else 0,
-                    'busy_count': 1 if response_type == 'busy' else 0,
-                    'skip_count': 1 if response_type == 'skip' else 0,
-                    'total_count': 1,
-                    'created_at': datetime.now().isoformat(),
-                    'last_updated': datetime.now().isoformat()
-                }
+                if stats is not None:
+                    # Update existing record
+                    stats[f'{response_type}_count'] = stats.get(f'{response_type}_count', 0) + 1
+                    stats['total_count'] = stats.get('total_count', 0) + 1
+                    stats['last_updated'] = iso
+                else:
+                    # Create new record
+                    day_stats[reminder_type] = {
+                        'date': today,
+                        'task_name': reminder_type,
+                        'ok_count': 1 if response_type == 'ok' else 0,
+                        'busy_count': 1 if response_type == 'busy' else 0,
+                        'skip_count': 1 if response_type == 'skip' else 0,
+                        'total_count': 1,
+                        'created_at': iso,
+                        'last_updated': iso
+                    }
                 
-                self.daily_stats_table.insert(stats)
+                # Persisted on the next flush()
+                self._dirty_stats.add(today)
+                self._invalidate_caches()
             
         except Exception as e:
             logging.error(f"Error updating daily stats: {e}")
@@ -138,12 +641,22 @@ class DatabaseManager:
             cutoff_time = datetime.now() - timedelta(hours=hours)
             cutoff_str = cutoff_time.isoformat()
             
-            Reminder = Query()
-            recent_responses = self.reminders_table.search(
-                Reminder.timestamp > cutoff_str
-            )
+            # Nothing logged inside the window: skip the cache and the lookups
+            if not self._timestamps or self._timestamps[-1][0] <= cutoff_str:
+                return []
+            
+            now = time.monotonic()
+            gen = self._cache_gen
+            cached = self._recent_cache.get(hours)
+            if cached is not None and cached[0] == gen and now < cached[1]:
+                return list(cached[2])
+            
+            # Bisect past every entry with timestamp <= cutoff, then take the tail
+            start = bisect.bisect_right(self._timestamps, (cutoff_str, float('inf')))
+            recent_responses = self._get_reminders([doc_id for _, doc_id in self._timestamps[start:]])
             
-            return recent_responses
+            self._recent_cache[hours] = (gen, now + RECENT_CACHE_TTL, recent_responses)
+            return list(recent_responses)
             
         except Exception as e:
             logging.error(f"Error getting recent responses: {e}")
@@ -153,13 +666,8 @@ class DatabaseManager:
         """Get the total count of skipped tasks for the current day."""
         try:
             today = datetime.now().strftime('%Y-%m-%d')
-            Reminder = Query()
-            todays_skips = self.reminders_table.search(
-                (Reminder.date == today) &
-                (Reminder.response_type == 'skip') &
-                (~Reminder.task_name.test(lambda x: x.endswith('_rescheduled')))
-            )
-            return len(todays_skips)
+            # Maintained incrementally by _index_reminder()
+            return self._skips_by_date.get(today, 0)
         except Exception as e:
             logging.error(f"Error getting total skips for today: {e}")
             return 0
@@ -169,24 +677,10 @@ class DatabaseManager:
         try:
             today = datetime.now().strftime('%Y-%m-%d')
             
-            Reminder = Query()
-            today_responses = self.reminders_table.search(
-                (Reminder.date == today) & 
-                (~Reminder.task_name.test(lambda x: x.endswith('_rescheduled'))) &
-                (~Reminder.task_name.test(lambda x: x == 'motivational_intervention'))
-            )
-            
-            # Sort by timestamp descending (most recent first)
-            today_responses.sort(key=lambda x: x['timestamp'], reverse=True)
-            
-            consecutive_skips = 0
-            for response in today_responses:
-                if response['response_type'] == 'skip':
-                    consecutive_skips += 1
-                else:
-                    break
-            
-            return consecutive_skips
+            # Maintained incrementally by record_response()
+            if self._consec_date != today:
+                return 0
+            return self._consec_skips
             
         except Exception as e:
             logging.error(f"Error getting consecutive skips: {e}")
@@ -195,43 +689,84 @@ class DatabaseManager:
     def get_overlapping_tasks(self):
         """Get count of overlapping/pending tasks"""
         try:
-            # Count busy responses that haven't been resolved yet
-            recent_busy = self.get_recent_responses(hours=2)
-            busy_count = sum(1 for response in recent_busy 
-                           if response['response_type'] == 'busy' 
-                           and response.get('final_status') == 'pending')
+            # Count busy responses from the last two hours that haven't been resolved yet
+            cutoff_str = (datetime.now() - timedelta(hours=2)).isoformat()
+            with self._lock:
+                busy_count = sum(1 for _, timestamp in self._pending_busy.values()
+                                 if timestamp > cutoff_str)
             return busy_count
             
         except Exception as e:
             logging.error(f"Error getting overlapping tasks: {e}")
             return 0
     
+    def resolve_busy(self, reminder_type):
+        """Mark the oldest pending 'busy' response for a reminder type as resolved"""
+        # The writer thread adds to _pending_busy under the same lock
+        with self._lock:
+            for doc_id, (task_name, _) in self._pending_busy.items():
+                if task_name == reminder_type:
+                    break
+            else:
+                return None
+            
+            # Persist it too, or the next index rebuild would bring it back as pending
+            self.reminders_table.update({'final_status': 'resolved'}, doc_ids=[doc_id])
+            del self._pending_busy[doc_id]
+            self._invalidate_caches()
+            return doc_id
+    
     def get_daily_summary(self, date=None):
         """Get daily summary statistics"""
         try:
             if date is None:
                 date = datetime.now().strftime('%Y-%m-%d')
             
-            DailyStats = Query()
-            daily_stats = self.daily_stats_table.search(DailyStats.date == date)
-            
-            return daily_stats
+            # Copies, so callers never see or change the live counters
+            with self._lock:
+                return [dict(row) for row in self._stats.get(date, {}).values()]
             
         except Exception as e:
             logging.error(f"Error getting daily summary: {e}")
             return []
     
+    def _aggregate_stats(self, days):
+        """Aggregate daily_stats over the last N days in a single scan"""
+        now = datetime.now()
+        cache_key = (days, now.strftime('%Y-%m-%d'))
+        cached = self._stats_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        cutoff_str = (now - timedelta(days=days)).strftime('%Y-%m-%d')
+        
+        # Fold each row into its task's Counter, then fold the (few) task
+        # Counters into the overall totals instead of adding every row twice
+        tasks = defaultdict(Counter)
+        # Snapshot the rows first; the writer thread changes them under the lock
+        with self._lock:
+            start = bisect.bisect_left(self._stats_dates, cutoff_str)
+            rows = [(task_name, {field: stat.get(field, 0) for field in STAT_COUNT_FIELDS})
+                    for date in self._stats_dates[start:]
+                    for task_name, stat in self._stats[date].items()]
+        for task_name, counts in rows:
+            tasks[task_name].update(counts)
+        
+        totals = Counter(dict.fromkeys(STAT_COUNT_FIELDS, 0))
+        for task_totals in tasks.values():
+            totals.update(task_totals)
+        
+        aggregate = {'totals': totals, 'tasks': dict(tasks)}
+        self._stats_cache[cache_key] = aggregate
+        return aggregate
+    
     def get_completion_rate(self, days=7):
         """Get completion rate over the last N days"""
         try:
-            cutoff_date = datetime.now() - timedelta(days=days)
-            cutoff_str = cutoff_date.strftime('%Y-%m-%d')
-            
-            DailyStats = Query()
-            recent_stats = self.daily_stats_table.search(DailyStats.date >= cutoff_str)
+            totals = self._aggregate_stats(days)['totals']
             
-            total_reminders = sum(stat.get('total_count', 0) for stat in recent_stats)
-            completed_reminders = sum(stat.get('ok_count', 0) for stat in recent_stats)
+            total_reminders = totals['total_count']
+            completed_reminders = totals['ok_count']
             
             if total_reminders > 0:
                 return (completed_reminders / total_reminders) * 100
@@ -244,19 +779,12 @@ class DatabaseManager:
     def get_task_performance(self, task_name, days=7):
         """Get performance statistics for a specific task"""
         try:
-            cutoff_date = datetime.now() - timedelta(days=days)
-            cutoff_str = cutoff_date.strftime('%Y-%m-%d')
-            
-            DailyStats = Query()
-            task_stats = self.daily_stats_table.search(
-                (DailyStats.date >= cutoff_str) & 
-                (DailyStats.task_name == task_name)
-            )
+            task_totals = self._aggregate_stats(days)['tasks'].get(task_name, {})
             
-            total_count = sum(stat.get('total_count', 0) for stat in task_stats)
-            ok_count = sum(stat.get('ok_count', 0) for stat in task_stats)
-            skip_count = sum(stat.get('skip_count', 0) for stat in task_stats)
-            busy_count = sum(stat.get('busy_count', 0) for stat in task_stats)
+            total_count = task_totals.get('total_count', 0)
+            ok_count = task_totals.get('ok_count', 0)
+            skip_count = task_totals.get('skip_count', 0)
+            busy_count = task_totals.get('busy_count', 0)
             
             return {
                 'task_name': task_name,
@@ -272,22 +800,32 @@ class DatabaseManager:
             logging.error(f"Error getting task performance: {e}")
             return {}
     
-    def clear_daily_data(self):
-        """Clear today's reminder data (for daily reset)"""
+    def clear_daily_data(self, today=None):
+        """Clear today's (or the given date's) reminder data (for daily reset)"""
         try:
-            today = datetime.now().strftime('%Y-%m-%d')
+            if today is None:
+                today = datetime.now().strftime('%Y-%m-%d')
             
-            Reminder = Query()
-            self.reminders_table.remove(Reminder.date == today)
+            self.reminders_table.remove(doc_ids=self._by_date.get(today, []))
+            self._unindex_dates([today])
             
-            DailyStats = Query()
-            self.daily_stats_table.remove(DailyStats.date == today)
+            self._drop_stats([today])
+            self._invalidate_caches()
+            # Persist the removal so the log can't replay the cleared records
+            self.flush()
             
             logging.info("Daily data cleared for reset")
             
         except Exception as e:
             logging.error(f"Error clearing daily data: {e}")
     
+    def archive_and_clear(self, summary_date, clear_date):
+        """Return the daily summary for summary_date and clear clear_date's data, in one flush"""
+        with self.batch():
+            summary = self.get_daily_summary(summary_date)
+            self.clear_daily_data(clear_date)
+            return summary
+    
     def archive_old_data(self, retention_days=30):
         """Archive data older than retention_days"""
         try:
@@ -297,11 +835,13 @@ class DatabaseManager:
             # Archive to separate file before deletion
             archive_path = self.db_path.parent / f"archive_{cutoff_date.strftime('%Y%m%d')}.json"
             
-            Reminder = Query()
-            old_reminders = self.reminders_table.search(Reminder.date < cutoff_str)
+            # Collect old doc_ids once from the date index and reuse them for the removal
+            old_dates = [date for date in self._by_date if date < cutoff_str]
+            old_ids = [doc_id for date in old_dates for doc_id in self._by_date[date]]
+            old_reminders = self._get_reminders(old_ids)
             
-            DailyStats = Query()
-            old_stats = self.daily_stats_table.search(DailyStats.date < cutoff_str)
+            old_stat_dates = self._stats_dates[:bisect.bisect_left(self._stats_dates, cutoff_str)]
+            old_stats = [row for date in old_stat_dates for row in self._stats[date].values()]
             
             if old_reminders or old_stats:
                 archive_data = {
@@ -310,12 +850,17 @@ class DatabaseManager:
                     'archived_on': datetime.now().isoformat()
                 }
                 
-                with open(archive_path, 'w') as f:
-                    json.dump(archive_data, f, indent=2)
+                # Compact output: archives are for safekeeping, not for reading by hand
+                with open(archive_path, 'wb') as f:
+                    f.write(_dumps(archive_data) + b'\n')
                 
                 # Remove old data from main database
-                self.reminders_table.remove(Reminder.date < cutoff_str)
-                self.daily_stats_table.remove(DailyStats.date < cutoff_str)
+                self.reminders_table.remove(doc_ids=old_ids)
+                self._drop_stats(old_stat_dates)
+                self._unindex_dates(old_dates)
+                self._invalidate_caches()
+                
+                self.flush()
                 
                 logging.info(f"Archived {len(old_reminders)} reminders and {len(old_stats)} daily stats to {archive_path}")
             
@@ -325,11 +870,13 @@ class DatabaseManager:
     def update_settings(self, key, value):
         """Update a setting in the database"""
         try:
-            Settings = Query()
-            if self.settings_table.search(Settings.last_reset_date.exists()):
-                self.settings_table.update({key: value}, Settings.last_reset_date.exists())
+            self._settings[key] = value
+            
+            # Write through to the settings document by doc_id, no probe query needed
+            if self._settings_doc_id is not None:
+                self.settings_table.update({key: value}, doc_ids=[self._settings_doc_id])
             else:
-                self.settings_table.insert({key: value})
+                self._settings_doc_id = self.settings_table.insert({key: value})
             
             logging.info(f"Updated setting {key} = {value}")
             
@@ -339,22 +886,21 @@ class DatabaseManager:
     def get_setting(self, key, default=None):
         """Get a setting from the database"""
         try:
-            Settings = Query()
-            settings_doc = self.settings_table.get(Settings[key].exists())
-            
-            if settings_doc:
-                return settings_doc[key]
-            else:
-                return default
+            return self._settings.get(key, default)
                 
         except Exception as e:
             logging.error(f"Error getting setting {key}: {e}")
             return default
     
     def get_wellness_insights(self):
-        """Get insights about wellness patterns"""
+        """Get insights about wellness patterns (cached until the next write or day change)"""
         try:
-            # Get data for the last week
+            now = datetime.now()
+            if (not self._insights_dirty and self._insights_cache is not None
+                    and now < self._insights_cached_until):
+                return self._insights_cache
+            
+            # Get data for the last week; every lookup below shares one aggregate scan
             week_performance = {}
             task_types = ['water', 'eye_rest', 'stretch', 'lunch', 'end_day']
             
@@ -369,14 +915,22 @@ class DatabaseManager:
             # Recent patterns
             recent_responses = self.get_recent_responses(hours=24)
             
-            return {
+            insights = {
                 'overall_completion_rate': overall_rate,
                 'task_performance': week_performance,
                 'recent_activity_count': len(recent_responses),
                 'consecutive_skips': self.get_consecutive_skips(),
-                'generated_at': datetime.now().isoformat()
+                'generated_at': now.isoformat()
             }
             
+            # Expire at the end of the day (plus a small grace period) even without writes
+            midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+            self._insights_cache = insights
+            self._insights_cached_until = midnight + INSIGHTS_CACHE_GRACE
+            self._insights_dirty = False
+            
+            return insights
+            
         except Exception as e:
             logging.error(f"Error generating wellness insights: {e}")
             return {}
@@ -384,7 +938,21 @@ class DatabaseManager:
     def close(self):
         """Close the database connection"""
         try:
-            self.db.close()
+            if self._closed:
+                return
+            self._flush_stop.set()
+            # Wait out a periodic flush that may be running before closing files
+            self._flush_thread.join()
+            with self._lock:
+                if self._closed:
+                    return
+                self.flush_pending()
+                self._flush_stats()
+                # Closing the caching middleware flushes pending writes first
+                self.db.close()
+                self._wal.truncate(0)
+                self._wal.close()
+                self._closed = True
             logging.info("Database connection closed")
         except Exception as e:
             logging.error(f"Error closing database: {e}")
@@ -4,26 +4,171 @@ Wellness Reminder Application - Main Entry Point (Fixed Threading)
 A background wellness reminder system for desk workers.
 """
 
-import schedule
 import time
 import threading
 import signal
 import sys
 from datetime import datetime, timedelta
-import json
 import logging
 from pathlib import Path
 import tkinter as tk
-from queue import Queue
+from queue import Queue, Empty
 import random
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+from collections import deque
+from dataclasses import dataclass
+from functools import partial
 
 from db import DatabaseManager
-from notifier import NotificationManager
-from utils import DateTimeUtils, DailyResetManager
+from notifier import NotificationManager, ReminderDialog
+from utils import DateTimeUtils, DailyResetManager, load_reminder_config
 from messages import MotivationalMessages
 
 # Define the base directory of the script to make paths absolute
 BASE_DIR = Path(__file__).resolve().parent
+CONFIG_PATH = BASE_DIR / 'reminder_config.json'
+DB_PATH = BASE_DIR / 'data' / 'wellness_reminders.json'
+LOG_PATH = BASE_DIR / 'logs' / 'wellness_app.log'
+
+# Fallback drain of the GUI queue in case a wakeup could not be posted
+GUI_WATCHDOG_MS = 1000
+
+# Pause between database write batches; responses arriving meanwhile share a batch
+WRITE_BATCH_SECONDS = 2
+
+# Longest single scheduler sleep. Condition waits run on the monotonic clock,
+# which stops during suspend, so due times are re-checked against time.time()
+SCHEDULER_MAX_WAIT_SECONDS = 60
+
+# Put on the write queue at shutdown to stop the database writer thread
+_STOP_WRITER = object()
+
+DEFAULT_MESSAGES = ("Default message.",)
+
+# Written out as reminder_config.json when the file is missing. Kept as
+# ready-made JSON text so creating it is a single write
+_DEFAULT_CONFIG_BYTES = """{
+  "reminders": {
+    "water": {
+      "interval_minutes": 75,
+      "messages": [
+        "💧 Time for some H2O! A hydrated mind is a sharp mind.",
+        "💧 Quick break for water! It's the easiest way to boost your energy.",
+        "💧 Don't forget to drink up! Your body will thank you.",
+        "💧 Stay hydrated, stay healthy. Time for a glass of water.",
+        "💧 Feeling sluggish? Water might be the answer. Have a sip!",
+        "💧 Let's raise a glass (of water) to your well-being!",
+        "💧 Hydration check! Have you had enough water today?"
+      ],
+      "enabled": true
+    },
+    "eye_rest": {
+      "interval_minutes": 20,
+      "messages": [
+        "👁️ Give your eyes a break. Look at something 20 feet away for 20 seconds.",
+        "👁️ Time for the 20-20-20 rule! Protect your peepers.",
+        "👁️ Your screen will be here when you get back. Rest your eyes.",
+        "👁️ Prevent eye strain! Look away from the screen now.",
+        "👁️ Blink, breathe, and look away. Your eyes deserve it.",
+        "👁️ A moment of rest for your eyes can prevent headaches later."
+      ],
+      "enabled": true
+    },
+    "stretch": {
+      "interval_minutes": 45,
+      "messages": [
+        "🧘 Time to stretch it out! Stand up and reach for the sky.",
+        "🧘 Loosen up! A quick stretch can release a lot of tension.",
+        "🧘 Your back and neck will thank you. Time for a stretch break.",
+        "🧘 Get the blood flowing! Stand up and move your body.",
+        "🧘 Sitting is the new smoking. Let's stand up and stretch!",
+        "🧘 Shake it off! A little movement goes a long way."
+      ],
+      "enabled": true
+    },
+    "lunch": {
+      "time": "13:30",
+      "messages": [
+        "🍽️ Lunch time! Step away from your desk and enjoy a proper meal.",
+        "🍽️ Fuel up! Your brain and body need energy to keep going.",
+        "🍽️ It's time to eat! Bon appétit!",
+        "🍽️ A mindful meal away from your screen can do wonders. Enjoy your lunch."
+      ],
+      "enabled": true
+    },
+    "end_day": {
+      "time": "19:30",
+      "messages": [
+        "🌅 Work is done! Time to close the laptop and enjoy your evening.",
+        "🌅 You've done enough for today. Time to wind down and relax.",
+        "🌅 The workday is over. Transition to your personal time, you've earned it!",
+        "🌅 Clocking out time! Leave work behind and focus on you."
+      ],
+      "enabled": true
+    }
+  },
+  "settings": {
+    "busy_delay_options": [
+      1,
+      5,
+      10
+    ],
+    "escalation_threshold": 2,
+    "escalation_window_hours": 2,
+    "data_retention_days": 30,
+    "notification_position": "bottom_right",
+    "compact_mode": true,
+    "auto_close_seconds": 45,
+    "motivational_cooldown_minutes": 30
+  }
+}
+""".encode('utf-8')
+
+def _daily_seconds(time_str):
+    """Seconds since midnight for an HH:MM string; ValueError if malformed"""
+    hour, minute = map(int, time_str.split(':'))
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"time out of range: {time_str}")
+    return hour * 3600 + minute * 60
+
+@dataclass(slots=True, frozen=True)
+class ReminderCfg:
+    """One entry of the config's 'reminders' section, resolved at load time"""
+    messages: tuple
+    enabled: bool
+    interval_s: float | None  # repeat every interval_s seconds
+    daily_s: int | None       # or once a day, at daily_s seconds past midnight
+
+def _reminder_configs(raw_reminders):
+    """Freeze the 'reminders' config section into {reminder_type: ReminderCfg}"""
+    reminders = {}
+    for reminder_type, config in raw_reminders.items():
+        interval_s = daily_s = None
+        if 'interval_minutes' in config:
+            interval_s = config['interval_minutes'] * 60
+        elif 'time' in config:
+            try:
+                daily_s = _daily_seconds(config['time'])
+            except ValueError:
+                logging.error("Invalid time for %s: %s, skipping", reminder_type, config['time'])
+        
+        reminders[reminder_type] = ReminderCfg(
+            messages=tuple(config.get('messages', DEFAULT_MESSAGES)),
+            enabled=config.get('enabled', True),
+            interval_s=interval_s,
+            daily_s=daily_s,
+        )
+    return reminders
+
+def _next_daily_ts(seconds_of_day):
+    """Timestamp of the next occurrence of seconds_of_day, today or tomorrow"""
+    now = datetime.now()
+    run = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(seconds=seconds_of_day)
+    if run <= now:
+        run += timedelta(days=1)
+    return run.timestamp()
 
 class WellnessReminder:
     def __init__(self):
@@ -31,14 +176,16 @@ class WellnessReminder:
         self.tk_root = tk.Tk()
         self.tk_root.withdraw()  # Hide the main window
         
-        # Queue for thread-safe GUI operations
-        self.gui_queue = Queue()
+        # One hidden reminder window, re-shown for every reminder
+        self._reminder_dialog = ReminderDialog(self.tk_root)
+        
+        # Queue for thread-safe GUI operations; deque append/popleft are
+        # atomic, and the Tk main thread is the only consumer
+        self.gui_queue = deque()
         
         self.setup_logging()
         
-        # Use absolute path for the database
-        db_path = BASE_DIR / "data" / "wellness_reminders.json"
-        self.db_manager = DatabaseManager(db_path)
+        self.db_manager = DatabaseManager(DB_PATH)
         
         self.notification_manager = NotificationManager(self.db_manager)
         self.datetime_utils = DateTimeUtils()
@@ -46,11 +193,31 @@ class WellnessReminder:
         self.motivational = MotivationalMessages(self.db_manager)
         
         self.config = self.load_config()
+        self.reminders = _reminder_configs(self.config['reminders'])
         self.running = True
         self.last_check_date = None
         
-        # Flag to prevent overlapping notifications
-        self.notification_active = False
+        self._rng = random.Random()
+        # Per-reminder shuffled runs of upcoming messages, refilled by _next_msg
+        self._msg_deque = {}
+        
+        # Job heap of (due_ts, seq, interval_seconds, daily_at, callback, args)
+        # run by run_scheduler; seq keeps equal due times in insertion order
+        self._jobs = []
+        self._jobs_cv = threading.Condition()
+        self._job_seq = itertools.count()
+        
+        # Reminder responses waiting for the database writer thread
+        self._write_q = Queue()
+        self._writer_thread = None
+        self._writer_stop = threading.Event()
+        
+        # Reused worker threads for handling responses off the GUI thread
+        self._response_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='resp')
+        
+        # Set while a reminder is shown and until its response is handled,
+        # to prevent overlapping notifications
+        self._notif_busy = threading.Event()
         
         # Set up signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self.signal_handler)
@@ -60,16 +227,14 @@ class WellnessReminder:
     
     def setup_logging(self):
         """Setup logging configuration"""
-        # Use absolute path for the logs directory
-        log_dir = BASE_DIR / "logs"
-        log_dir.mkdir(exist_ok=True)
+        LOG_PATH.parent.mkdir(exist_ok=True)
         
         logging.basicConfig(
             level=logging.INFO,
             format='%(asctime)s - %(levelname)s - %(message)s',
             handlers=[
                 # Fix for UnicodeEncodeError by specifying UTF-8 encoding
-                logging.FileHandler(log_dir / 'wellness_app.log', encoding='utf-8'),
+                logging.FileHandler(LOG_PATH, encoding='utf-8', delay=True),
                 logging.StreamHandler()
             ]
         )
@@ -77,151 +242,123 @@ class WellnessReminder:
     def load_config(self):
         """Load reminder configuration from JSON file"""
         try:
-            # Use absolute path for the config file
-            with open(BASE_DIR / 'reminder_config.json', 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            try:
+                # The parsed dict is shared with the other modules; callers only read it
+                config = load_reminder_config(CONFIG_PATH)
+            except FileNotFoundError:
+                logging.error("reminder_config.json not found. Creating default configuration.")
+                self.create_default_config()
+                config = load_reminder_config(CONFIG_PATH)
             logging.info("Configuration loaded successfully")
             return config
-        except FileNotFoundError:
-            logging.error("reminder_config.json not found. Creating default configuration.")
-            self.create_default_config()
-            return self.load_config()
-        except json.JSONDecodeError as e:
-            logging.error(f"Error parsing configuration file: {e}")
+        except ValueError as e:
+            # json.JSONDecodeError and orjson.JSONDecodeError both subclass ValueError
+            logging.error("Error parsing configuration file: %s", e)
             sys.exit(1)
     
     def create_default_config(self):
         """Create default configuration file"""
         # This function is now a fallback. The primary config is reminder_config.json
-        default_config = {
-                "reminders": {
-                    "water": {
-                    "interval_minutes": 75,
-                    "messages": [
-                        "💧 Time for some H2O! A hydrated mind is a sharp mind.",
-                        "💧 Quick break for water! It's the easiest way to boost your energy.",
-                        "💧 Don't forget to drink up! Your body will thank you.",
-                        "💧 Stay hydrated, stay healthy. Time for a glass of water.",
-                        "💧 Feeling sluggish? Water might be the answer. Have a sip!",
-                        "💧 Let's raise a glass (of water) to your well-being!",
-                        "💧 Hydration check! Have you had enough water today?"
-                    ],
-                    "enabled": True
-                    },
-                    "eye_rest": {
-                    "interval_minutes": 20,
-                    "messages": [
-                        "👁️ Give your eyes a break. Look at something 20 feet away for 20 seconds.",
-                        "👁️ Time for the 20-20-20 rule! Protect your peepers.",
-                        "👁️ Your screen will be here when you get back. Rest your eyes.",
-                        "👁️ Prevent eye strain! Look away from the screen now.",
-                        "👁️ Blink, breathe, and look away. Your eyes deserve it.",
-                        "👁️ A moment of rest for your eyes can prevent headaches later."
-                    ],
-                    "enabled": True
-                    },
-                    "stretch": {
-                    "interval_minutes": 45,
-                    "messages": [
-                        "🧘 Time to stretch it out! Stand up and reach for the sky.",
-                        "🧘 Loosen up! A quick stretch can release a lot of tension.",
-                        "🧘 Your back and neck will thank you. Time for a stretch break.",
-                        "🧘 Get the blood flowing! Stand up and move your body.",
-                        "🧘 Sitting is the new smoking. Let's stand up and stretch!",
-                        "🧘 Shake it off! A little movement goes a long way."
-                    ],
-                    "enabled": True
-                    },
-                    "lunch": {
-                    "time": "13:30",
-                    "messages": [
-                        "🍽️ Lunch time! Step away from your desk and enjoy a proper meal.",
-                        "🍽️ Fuel up! Your brain and body need energy to keep going.",
-                        "🍽️ It's time to eat! Bon appétit!",
-                        "🍽️ A mindful meal away from your screen can do wonders. Enjoy your lunch."
-                    ],
-                    "enabled": True
-                    },
-                    "end_day": {
-                    "time": "19:30",
-                    "messages": [
-                        "🌅 Work is done! Time to close the laptop and enjoy your evening.",
-                        "🌅 You've done enough for today. Time to wind down and relax.",
-                        "🌅 The workday is over. Transition to your personal time, you've earned it!",
-                        "🌅 Clocking out time! Leave work behind and focus on you."
-                    ],
-                    "enabled": True
-                    }
-                },
-                "settings": {
-                    "busy_delay_options": [
-                        1,
-                        5,
-                        10
-                    ],
-                    "escalation_threshold": 2,
-                    "escalation_window_hours": 2,
-                    "data_retention_days": 30,
-                    "notification_position": "bottom_right",
-                    "compact_mode": True,
-                    "auto_close_seconds": 45,
-                    "motivational_cooldown_minutes": 30
-                }
-                }
-
-        
-        # Use absolute path for the config file
-        with open(BASE_DIR / 'reminder_config.json', 'w', encoding='utf-8') as f:
-            json.dump(default_config, f, indent=2, ensure_ascii=False)
+        CONFIG_PATH.write_bytes(_DEFAULT_CONFIG_BYTES)
         
         logging.info("Default configuration created")
     
     def schedule_reminders(self):
         """Schedule all reminders based on configuration"""
-        reminders = self.config['reminders']
-        
-        schedule.clear()
+        # Compiled once into (seconds, callback) lists for the job heap
+        self._interval_jobs = []
+        self._daily_jobs = []
         
-        for reminder_type, config in reminders.items():
-            if not config.get('enabled', True):
-                logging.info(f"Reminder {reminder_type} is disabled, skipping")
+        for reminder_type, reminder in self.reminders.items():
+            if not reminder.enabled:
+                logging.info("Reminder %s is disabled, skipping", reminder_type)
                 continue
             
             # The message is chosen right before queuing to ensure variety
-            if 'interval_minutes' in config:
-                interval = config['interval_minutes']
-                schedule.every(interval).minutes.do(
-                    self.queue_reminder, 
-                    reminder_type
-                )
-                logging.info(f"Scheduled {reminder_type} every {interval} minutes")
-            elif 'time' in config:
-                time_str = config['time']
-                schedule.every().day.at(time_str).do(
-                    self.queue_reminder,
-                    reminder_type
-                )
-                logging.info(f"Scheduled {reminder_type} reminder at {time_str}")
+            callback = partial(self.queue_reminder, reminder_type)
+            if reminder.interval_s is not None:
+                self._interval_jobs.append((reminder.interval_s, callback))
+                logging.info("Scheduled %s every %g minutes", reminder_type, reminder.interval_s / 60)
+            elif reminder.daily_s is not None:
+                self._daily_jobs.append((reminder.daily_s, callback))
+                logging.info("Scheduled %s reminder at %02d:%02d", reminder_type,
+                             *divmod(reminder.daily_s // 60, 60))
+        
+        self._daily_jobs.sort(key=lambda job: job[0])
+        
+        now = time.time()
+        with self._jobs_cv:
+            self._jobs.clear()
+        for interval, callback in self._interval_jobs:
+            self.add_job(now + interval, callback, interval=interval)
+        for seconds_of_day, callback in self._daily_jobs:
+            self.add_daily_job(seconds_of_day, callback)
 
-        schedule.every().day.at("00:01").do(self.check_daily_reset)
-        logging.info(f"Total scheduled jobs: {len(schedule.get_jobs())}")
+        logging.info("Total scheduled jobs: %s", len(self._jobs))
+    
+    def add_job(self, due_ts, callback, *args, interval=None, daily_at=None):
+        """Push a job onto the scheduler heap and wake the scheduler thread"""
+        with self._jobs_cv:
+            heapq.heappush(
+                self._jobs,
+                (due_ts, next(self._job_seq), interval, daily_at, callback, args)
+            )
+            self._jobs_cv.notify()
+    
+    def add_daily_job(self, seconds_of_day, callback, *args):
+        """Schedule callback every day at seconds_of_day past midnight"""
+        self.add_job(_next_daily_ts(seconds_of_day), callback, *args, daily_at=seconds_of_day)
     
     def queue_reminder(self, reminder_type):
         """Queue a reminder to be processed by the main thread"""
+        # The daily reset rides on the first reminder of each new day
+        today = datetime.now().date()
+        if today != self.last_check_date:
+            self.last_check_date = today
+            self._response_pool.submit(self.check_daily_reset)
+        
         # Get a fresh random message when it's time to queue the reminder
-        messages = self.config['reminders'].get(reminder_type, {}).get("messages", ["Default message."])
-        message_to_send = random.choice(messages)
-        self.gui_queue.put(('reminder', reminder_type, message_to_send))
+        message_to_send = self._next_msg(reminder_type)
+        self.put_gui(('reminder', reminder_type, message_to_send))
+    
+    def _next_msg(self, reminder_type):
+        """Next message for reminder_type from a shuffled run of its messages"""
+        messages = self._msg_deque.get(reminder_type)
+        if not messages:
+            reminder = self.reminders.get(reminder_type)
+            pool = list(reminder.messages if reminder else DEFAULT_MESSAGES) * 4
+            self._rng.shuffle(pool)
+            messages = self._msg_deque[reminder_type] = deque(pool)
+        return messages.popleft()
     
     def queue_motivational(self):
         """Queue a motivational message to be processed by the main thread"""
-        self.gui_queue.put(('motivational',))
+        self.put_gui(('motivational',))
+    
+    def put_gui(self, item):
+        """Queue a GUI operation and wake the main thread to handle it"""
+        self.gui_queue.append(item)
+        try:
+            self.tk_root.after_idle(self._drain_gui_queue)
+        except (RuntimeError, tk.TclError):
+            # Tk is not in its main loop yet; the watchdog will drain it
+            pass
     
     def process_gui_queue(self):
+        """Drain the GUI queue and re-arm the watchdog (runs in main thread)"""
+        self._drain_gui_queue()
+        
+        if self.running:
+            self.tk_root.after(GUI_WATCHDOG_MS, self.process_gui_queue)
+    
+    def _drain_gui_queue(self):
         """Process GUI operations from the queue (runs in main thread)"""
         try:
-            while not self.gui_queue.empty():
-                item = self.gui_queue.get_nowait()
+            while True:
+                try:
+                    item = self.gui_queue.popleft()
+                except IndexError:
+                    break
                 
                 if item[0] == 'reminder':
                     _, reminder_type, message = item
@@ -232,40 +369,41 @@ class WellnessReminder:
                     self.show_startup_notification_main_thread()
                 
         except Exception as e:
-            logging.error(f"Error processing GUI queue: {e}")
-        
-        if self.running:
-            self.tk_root.after(100, self.process_gui_queue)
+            logging.error("Error processing GUI queue: %s", e)
     
     def send_reminder_main_thread(self, reminder_type, message):
         """Send a reminder notification in the main thread"""
-        if self.notification_active:
-            logging.warning(f"Skipping reminder '{reminder_type}' because another notification is already active.")
+        if self._notif_busy.is_set():
+            logging.warning("Skipping reminder '%s' because another notification is already active.", reminder_type)
             return
-            
+        
+        self._notif_busy.set()
         try:
-            self.notification_active = True
-            logging.info(f"Sending {reminder_type} reminder")
-            response = self.notification_manager.show_reminder(reminder_type, message)
+            logging.info("Sending %s reminder", reminder_type)
+            response = self.notification_manager.show_reminder(
+                reminder_type, message, dialog=self._reminder_dialog
+            )
             
-            # Handle response in a separate thread to not block the GUI
-            threading.Thread(
-                target=self.handle_reminder_response,
-                args=(reminder_type, response),
-                daemon=True
-            ).start()
+            # Handle response in a worker thread to not block the GUI;
+            # the worker clears _notif_busy when it is done
+            self._response_pool.submit(self._handle_and_clear, reminder_type, response)
             
         except Exception as e:
-            logging.error(f"Error sending reminder {reminder_type}: {e}")
+            logging.error("Error sending reminder %s: %s", reminder_type, e)
+            self._notif_busy.clear()
+    
+    def _handle_and_clear(self, reminder_type, response):
+        try:
+            self.handle_reminder_response(reminder_type, response)
         finally:
-            self.notification_active = False
+            self._notif_busy.clear()
 
     def show_motivational_main_thread(self):
         """Show motivational message in the main thread"""
         try:
             self.motivational.show_motivational_message()
         except Exception as e:
-            logging.error(f"Error showing motivational message: {e}")
+            logging.error("Error showing motivational message: %s", e)
     
     def show_startup_notification_main_thread(self):
         """Show startup notification in the main thread"""
@@ -276,7 +414,7 @@ class WellnessReminder:
             MotivationalDialog.show_motivational_message(startup_message)
             
         except Exception as e:
-            logging.error(f"Error showing startup notification: {e}")
+            logging.error("Error showing startup notification: %s", e)
     
     def handle_reminder_response(self, reminder_type, response):
         """Handle user response to reminder"""
@@ -284,53 +422,105 @@ class WellnessReminder:
             response_type = response.get('action', 'skip')
             delay_minutes = response.get('delay_minutes', 0)
             
-            logging.info(f"User response for {reminder_type}: {response_type} (delay: {delay_minutes})")
+            logging.info("User response for %s: %s (delay: %s)", reminder_type, response_type, delay_minutes)
             
+            now = datetime.now()
             rescheduled_time = None
             if response_type == 'busy' and delay_minutes > 0:
-                rescheduled_time = datetime.now() + timedelta(minutes=delay_minutes)
+                rescheduled_time = now + timedelta(minutes=delay_minutes)
             
-            self.db_manager.log_reminder_response(
-                reminder_type, 
-                response_type, 
-                delay_minutes,
-                rescheduled_time
-            )
+            # Logged by the writer thread; the response time travels with it
+            self._write_q.put((reminder_type, response_type, delay_minutes, rescheduled_time, now))
             
             if response_type == 'busy' and delay_minutes > 0:
-                def reschedule_reminder():
-                    try:
-                        logging.info(f"Sending rescheduled {reminder_type} reminder")
-                        messages = self.config['reminders'][reminder_type]['messages']
-                        original_message = random.choice(messages)
-                        rescheduled_message = f"⏰ Rescheduled: {original_message}"
-                        
-                        self.gui_queue.put(('reminder', reminder_type, rescheduled_message))
-                        
-                    except Exception as e:
-                        logging.error(f"Error sending rescheduled reminder: {e}")
-                
-                timer = threading.Timer(delay_minutes * 60, reschedule_reminder)
-                timer.daemon = True
-                timer.start()
+                self.add_job(
+                    time.time() + delay_minutes * 60,
+                    self.send_rescheduled_reminder,
+                    reminder_type
+                )
                 
-                logging.info(f"Rescheduled {reminder_type} in {delay_minutes} minutes")
+                logging.info("Rescheduled %s in %s minutes", reminder_type, delay_minutes)
+            
+        except Exception as e:
+            logging.error("Error handling reminder response: %s", e)
+    
+    def run_db_writer(self):
+        """Write queued reminder responses to the database in batches"""
+        logging.info("Starting database writer thread...")
+        
+        while not self._writer_stop.is_set():
+            item = self._write_q.get()
+            if item is _STOP_WRITER:
+                break
+            self.write_responses([item])
+            self._writer_stop.wait(WRITE_BATCH_SECONDS)
+    
+    def _stop_db_writer(self):
+        """Stop the writer thread and wait for the batch it is writing"""
+        thread, self._writer_thread = self._writer_thread, None
+        if thread is None:
+            return
+        # The event ends the pause between batches; the sentinel wakes a blocked get()
+        self._writer_stop.set()
+        self._write_q.put(_STOP_WRITER)
+        if thread is not threading.current_thread():
+            thread.join()
+    
+    def write_responses(self, items=None):
+        """Log every queued response in one batch, then run the follow-up checks"""
+        items = list(items or ())
+        try:
+            while True:
+                item = self._write_q.get_nowait()
+                if item is _STOP_WRITER:
+                    # Drained along with the responses; stop the writer loop instead
+                    self._writer_stop.set()
+                    continue
+                items.append(item)
+        except Empty:
+            pass
+        
+        if not items:
+            return
+        
+        try:
+            self.db_manager.log_many(items)
+            self.motivational.invalidate_skip_cache()
+            response_types = {item[1] for item in items}
             
             # If user skipped, check if a motivational message is needed.
             # The skip tracker is no longer reset on 'ok'.
-            if response_type == 'skip':
+            if 'skip' in response_types:
                 # Check for escalation immediately after a skip
                 if self.motivational.should_escalate():
                     logging.info("Queueing motivational message due to escalation.")
                     self.queue_motivational()
-            elif response_type == 'ok':
+            if 'ok' in response_types:
                 # Encouragement can still be shown without resetting the main skip counter
                 if self.motivational.should_show_encouragement():
                     encouragement = self.motivational.get_encouragement_for_completion()
-                    logging.info(f"Showing encouragement: {encouragement}")
+                    logging.info("Showing encouragement: %s", encouragement)
 
         except Exception as e:
-            logging.error(f"Error handling reminder response: {e}")
+            logging.error("Error writing reminder responses: %s", e)
+    
+    def send_rescheduled_reminder(self, reminder_type):
+        """Queue a reminder that was postponed with 'busy'"""
+        try:
+            logging.info("Sending rescheduled %s reminder", reminder_type)
+            original_message = self._next_msg(reminder_type)
+            rescheduled_message = f"⏰ Rescheduled: {original_message}"
+            
+            self.put_gui(('reminder', reminder_type, rescheduled_message))
+            
+        except Exception as e:
+            logging.error("Error sending rescheduled reminder: %s", e)
+        
+        # Bookkeeping only; a failure here must not drop the reminder above
+        try:
+            self.db_manager.resolve_busy(reminder_type)
+        except Exception as e:
+            logging.error("Error resolving busy %s reminder: %s", reminder_type, e)
     
     def check_daily_reset(self):
         """Check if daily reset is needed"""
@@ -340,27 +530,55 @@ class WellnessReminder:
                 self.motivational.reset_daily_counters()
                 logging.info("Daily reset completed")
         except Exception as e:
-            logging.error(f"Error during daily reset: {e}")
+            logging.error("Error during daily reset: %s", e)
     
     def run_scheduler(self):
         """Run the scheduler in a separate thread"""
         logging.info("Starting scheduler thread...")
         
-        while self.running:
+        while True:
+            with self._jobs_cv:
+                # Sleep until the earliest job is due, in capped steps so a
+                # suspend/resume is noticed; add_job wakes us early
+                while self.running:
+                    wait = self._jobs[0][0] - time.time() if self._jobs else None
+                    if wait is not None and wait <= 0:
+                        break
+                    self._jobs_cv.wait(SCHEDULER_MAX_WAIT_SECONDS if wait is None
+                                       else min(wait, SCHEDULER_MAX_WAIT_SECONDS))
+                
+                if not self.running:
+                    return
+                
+                _, _, interval, daily_at, callback, args = heapq.heappop(self._jobs)
+            
+            if interval:
+                self.add_job(time.time() + interval, callback, *args, interval=interval)
+            elif daily_at is not None:
+                self.add_daily_job(daily_at, callback, *args)
+            
             try:
-                schedule.run_pending()
-                time.sleep(1)
+                callback(*args)
             except Exception as e:
-                logging.error(f"Error in scheduler loop: {e}")
-                time.sleep(5)
+                logging.error("Error in scheduler loop: %s", e)
     
     def signal_handler(self, signum, frame):
         """Handle shutdown signals gracefully"""
-        logging.info(f"Received signal {signum}, shutting down gracefully...")
+        logging.info("Received signal %s, shutting down gracefully...", signum)
         self.running = False
+        with self._jobs_cv:
+            self._jobs_cv.notify_all()
+        self._response_pool.shutdown(wait=False, cancel_futures=True)
         if self.tk_root:
             self.tk_root.quit()
-        if self.db_manager:
+        if self._writer_thread is not None:
+            # Joining here could deadlock: the writer may be waiting on a Tk call
+            # this thread has to service. Just ask it to stop; run() does the
+            # final write once mainloop has returned
+            self._writer_stop.set()
+            self._write_q.put(_STOP_WRITER)
+        elif self.db_manager:
+            self.write_responses()
             self.db_manager.close()
         sys.exit(0)
     
@@ -375,10 +593,12 @@ class WellnessReminder:
             self.db_manager.initialize_database()
             
             self.schedule_reminders()
-            self.gui_queue.put(('startup',))
+            self.put_gui(('startup',))
             
             scheduler_thread = threading.Thread(target=self.run_scheduler, daemon=True)
             scheduler_thread.start()
+            self._writer_thread = threading.Thread(target=self.run_db_writer, daemon=True)
+            self._writer_thread.start()
             
             self.process_gui_queue()
             
@@ -392,12 +612,14 @@ class WellnessReminder:
                 self.running = False
                 
         except Exception as e:
-            logging.error(f"Fatal error: {e}")
+            logging.error("Fatal error: %s", e)
         finally:
             logging.info("Application shutting down")
             if self.db_manager:
+                self._stop_db_writer()
+                self.write_responses()
                 self.db_manager.close()
-            self.running = False
+                self.running = False
     
     def run_test_mode(self):
         """Run in test mode - single reminder for testing"""
@@ -412,19 +634,19 @@ class WellnessReminder:
                 return
             
             reminder_type = "water"
-            messages = self.config['reminders']['water']['messages']
-            message = random.choice(messages)
+            message = self._next_msg(reminder_type)
             
-            logging.info(f"Sending test reminder: {reminder_type}")
+            logging.info("Sending test reminder: %s", reminder_type)
             
             response = self.notification_manager.show_reminder(reminder_type, message)
             
             self.handle_reminder_response(reminder_type, response)
+            self.write_responses()
             
-            logging.info(f"Test completed. Response: {response}")
+            logging.info("Test completed. Response: %s", response)
             
         except Exception as e:
-            logging.error(f"Error in test mode: {e}")
+            logging.error("Error in test mode: %s", e)
         finally:
             if self.db_manager:
                 self.db_manager.close()
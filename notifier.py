@@ -7,155 +7,129 @@ Fixed for proper threading.
 import tkinter as tk
 from tkinter import messagebox, ttk
 import logging
-import json
 from datetime import datetime
-import threading
-import time
-from pathlib import Path
+from functools import lru_cache
+from utils import load_reminder_config
 
-# Define the base directory of the script to make paths absolute
-BASE_DIR = Path(__file__).resolve().parent
+@lru_cache(maxsize=32)
+def _rounded_points(w, h, radius):
+    """Rounded-rectangle polygon points relative to the top-left corner"""
+    return (radius, 0, w-radius, 0,
+            w, 0, w, radius,
+            w, h-radius, w, h,
+            w-radius, h, radius, h,
+            0, h, 0, h-radius,
+            0, radius, 0, 0)
+
+# Screen size does not change while the app runs, so it is queried once
+_SCREEN = None
+
+def _screen(win):
+    global _SCREEN
+    if _SCREEN is None:
+        _SCREEN = (win.winfo_screenwidth(), win.winfo_screenheight())
+    return _SCREEN
+
+@lru_cache(maxsize=8)
+def _slide_xs(start_x, end_x, steps=15):
+    """Ease-out x positions for each frame of the slide-in animation"""
+    return tuple(int(start_x + (end_x - start_x) * (1 - (1 - i / steps) ** 3))
+                 for i in range(steps + 1))
 
 class NotificationManager:
+    _ICON_MAP = {'water': '💧', 'eye_rest': '👁️', 'stretch': '🧘', 'lunch': '🍽️', 'end_day': '🌅'}
+    # (icon, leading "<icon> " removed from a message before it is shown next to the icon)
+    _ICON_PREFIX = {rtype: (icon, icon + ' ') for rtype, icon in _ICON_MAP.items()}
+    _DEFAULT_ICON_PREFIX = ('🔔', '🔔 ')
+    # (label, action, color) per reminder type; actions are bound to handlers per dialog
+    _BTN_TEMPLATES = {
+        'water': (('✓ Drank', 'ok', '#20B2AA'), ('Later', 'busy', '#B0BEC5'), ('Skip', 'skip', '#CFD8DC')),
+        'eye_rest': (('✓ Rested', 'ok', '#20B2AA'), ('Busy', 'busy', '#B0BEC5'), ('Skip', 'skip', '#CFD8DC')),
+        'stretch': (('✓ Stretched', 'ok', '#20B2AA'), ('Later', 'busy', '#B0BEC5'), ('Skip', 'skip', '#CFD8DC')),
+        'lunch': (('✓ Eating', 'ok', '#20B2AA'), ('In 15min', 'busy15', '#B0BEC5'), ('Skip', 'skip', '#CFD8DC')),
+        'end_day': (('✓ Done', 'ok', '#20B2AA'), ('15 more min', 'busy15', '#B0BEC5')),
+    }
+    
     def __init__(self, db_manager):
         self.db_manager = db_manager
         self.config = self._load_config()
         self.busy_delay_options = self.config.get('settings', {}).get('busy_delay_options', [10, 15, 30])
         self.auto_close_seconds = self.config.get('settings', {}).get('auto_close_seconds', 45)
+        # Hidden dialog reused when show_reminder is called without one
+        self._template = None
 
     def _load_config(self):
         """Load settings from config file"""
         try:
-            with open(BASE_DIR / 'reminder_config.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_reminder_config()
         except Exception as e:
             logging.warning(f"Could not load notification settings: {e}")
             return {}
 
-    def show_reminder(self, reminder_type, message):
-        """Show a reminder notification and get user response"""
+    def show_reminder(self, reminder_type, message, dialog=None):
+        """Show a reminder notification and get user response
+        
+        Pass a ReminderDialog to use it instead of the manager's own template.
+        """
         try:
-            response = self._show_windows_style_notification(reminder_type, message)
+            response = self._show_windows_style_notification(reminder_type, message, dialog)
             return response
         except Exception as e:
             logging.error(f"Error showing reminder notification: {e}")
             return {'action': 'skip', 'delay_minutes': 0}
 
-    def _show_windows_style_notification(self, reminder_type, message):
+    def _show_windows_style_notification(self, reminder_type, message, dialog=None):
         """Show compact Windows-style notification in corner"""
-        response = {'action': 'skip', 'delay_minutes': 0}
-        
-        dialog = tk.Toplevel()
-        
-        def on_ok():
-            response['action'] = 'ok'
-            dialog.destroy()
-        
-        def on_busy():
-            delay = self._show_compact_delay_dialog(dialog)
-            if delay > 0:
-                response['action'] = 'busy'
-                response['delay_minutes'] = delay
-            dialog.destroy()
-        
-        def on_skip():
-            response['action'] = 'skip'
-            dialog.destroy()
-
-        dialog.title("")
-        dialog.geometry("320x140")
-        dialog.resizable(False, False)
-        dialog.overrideredirect(True)
-        
-        try:
-            dialog.attributes('-alpha', 0.98)
-            dialog.attributes('-topmost', True)
-        except tk.TclError:
-            pass 
-        
-        self._position_notification_area(dialog)
-        
-        # --- Calming UI Theme ---
-        canvas = tk.Canvas(dialog, highlightthickness=0, bg="#E8F5E8") # Sage green background
-        canvas.pack(fill=tk.BOTH, expand=True)
-        
-        # Gentle shadow effect by drawing a slightly larger, darker rectangle underneath
-        self._create_rounded_rectangle(canvas, 4, 4, 316, 136, radius=12, fill="#D5DBDB")
-        
-        # Main white content card
-        bg_color = "#FFFFFF"
-        self._create_rounded_rectangle(canvas, 2, 2, 318, 138, radius=10, fill=bg_color)
+        if dialog is None:
+            dialog = self._template or self._build_template()
+        if not dialog.exists():
+            dialog.build()
+        
+        icon, prefix = self._ICON_PREFIX.get(reminder_type, self._DEFAULT_ICON_PREFIX)
+        clean_message = message[len(prefix):] if message.startswith(prefix) else message
+        clean_message = clean_message.strip()
+        dialog.set_text(icon, clean_message)
+        
+        dialog.set_buttons(reminder_type, lambda parent: self._create_task_specific_buttons(
+            parent, reminder_type,
+            lambda: dialog.close('ok'),
+            lambda delay=None: self._on_busy(dialog, delay),
+            lambda: dialog.close('skip')
+        ))
+        
+        dialog.show()
+        window = dialog.window
+        # One layout pass per show; positioning and the animation reuse its geometry
+        window.update_idletasks()
+        position = self._position_notification_area(window, (window.winfo_width(), window.winfo_height()))
+        self._animate_slide_in(window, position)
+        return dialog.wait_response(self.auto_close_seconds)
 
-        content_frame = tk.Frame(canvas, bg=bg_color)
-        content_frame.place(x=10, y=10, width=300, height=120)
+    def _build_template(self):
+        """Create the manager's hidden reminder dialog"""
+        self._template = ReminderDialog()
+        return self._template
 
-        header_frame = tk.Frame(content_frame, bg=bg_color, height=25)
-        header_frame.pack(fill=tk.X, pady=(0, 5))
-        header_frame.pack_propagate(False)
-        
-        app_label = tk.Label(
-            header_frame, text="Wellness Reminder", font=('Segoe UI', 9, 'bold'),
-            fg='#2D3748', bg=bg_color # Dark charcoal text
-        )
-        app_label.pack(side=tk.LEFT)
-        
-        close_btn = tk.Button(
-            header_frame, text="×", font=('Segoe UI', 12, 'bold'), fg='#718096', bg=bg_color, # Medium gray text
-            bd=0, highlightthickness=0, activebackground='#E57373', activeforeground='white',
-            cursor='hand2', command=dialog.destroy
-        )
-        close_btn.pack(side=tk.RIGHT)
-        
-        message_frame = tk.Frame(content_frame, bg=bg_color)
-        message_frame.pack(fill=tk.X, pady=(0, 8))
-        
-        icon_map = {'water': '💧', 'eye_rest': '👁️', 'stretch': '🧘', 'lunch': '🍽️', 'end_day': '🌅'}
-        icon = icon_map.get(reminder_type, '🔔')
-        clean_message = message.lstrip(icon + " ").strip()
-        
-        icon_label = tk.Label(message_frame, text=icon, font=('Segoe UI Emoji', 18), bg=bg_color)
-        icon_label.grid(row=0, column=0, sticky='n', padx=(0, 10))
-        
-        message_label = tk.Label(
-            message_frame, text=clean_message, font=('Segoe UI', 10), fg='#2D3748', bg=bg_color,
-            wraplength=240, justify='left'
-        )
-        message_label.grid(row=0, column=1, sticky='w')
-        message_frame.grid_columnconfigure(1, weight=1)
-        
-        self._create_task_specific_buttons(content_frame, reminder_type, on_ok, on_busy, on_skip)
-        
-        dialog.bind('<Return>', lambda e: on_ok())
-        dialog.bind('<Escape>', lambda e: on_skip())
-        
-        auto_close_timer = threading.Timer(self.auto_close_seconds, lambda: dialog.destroy() if dialog.winfo_exists() else None)
-        auto_close_timer.daemon = True
-        auto_close_timer.start()
-        
-        self._animate_slide_in(dialog)
-        dialog.wait_window()
-        
-        auto_close_timer.cancel()
-        
-        return response
+    def _on_busy(self, dialog, delay=None):
+        if delay is None:
+            delay = self._show_compact_delay_dialog(dialog.window)
+        if delay > 0:
+            dialog.close('busy', delay)
+        else:
+            dialog.close('skip')
 
     def _create_task_specific_buttons(self, parent, reminder_type, on_ok, on_busy, on_skip):
+        """Build the button row for a reminder type; the caller packs it"""
         button_frame = tk.Frame(parent, bg=parent.cget('bg'))
-        button_frame.pack(fill=tk.X, side=tk.BOTTOM, pady=(5,0))
-        
-        button_configs = {
-            'water': [('✓ Drank', on_ok, '#20B2AA'), ('Later', on_busy, '#B0BEC5'), ('Skip', on_skip, '#CFD8DC')],
-            'eye_rest': [('✓ Rested', on_ok, '#20B2AA'), ('Busy', on_busy, '#B0BEC5'), ('Skip', on_skip, '#CFD8DC')],
-            'stretch': [('✓ Stretched', on_ok, '#20B2AA'), ('Later', on_busy, '#B0BEC5'), ('Skip', on_skip, '#CFD8DC')],
-            'lunch': [('✓ Eating', on_ok, '#20B2AA'), ('In 15min', lambda: on_busy(15), '#B0BEC5'), ('Skip', on_skip, '#CFD8DC')],
-            'end_day': [('✓ Done', on_ok, '#20B2AA'), ('15 more min', lambda: on_busy(15), '#B0BEC5')]
-        }
         
-        buttons = button_configs.get(reminder_type, button_configs['water'])
+        handlers = {'ok': on_ok, 'busy': on_busy, 'skip': on_skip, 'busy15': lambda: on_busy(15)}
+        buttons = self._BTN_TEMPLATES.get(reminder_type, self._BTN_TEMPLATES['water'])
         
-        for i, (text, command, bg_color) in enumerate(buttons):
-            btn = self._create_modern_button(button_frame, text, command, bg_color)
+        for text, action, bg_color in buttons:
+            btn = self._create_modern_button(button_frame, text, handlers[action], bg_color)
             btn.pack(side=tk.LEFT, padx=(0, 5), fill=tk.X, expand=True)
+        
+        return button_frame
 
     @staticmethod
     def _create_modern_button(parent, text, command, bg_color):
@@ -173,28 +147,42 @@ class NotificationManager:
         btn.bind('<Leave>', on_leave)
         return btn
 
-    def _position_notification_area(self, window):
+    def _position_notification_area(self, window, size=None):
+        """Move window to the bottom-right corner and return its (x, y)"""
         try:
-            window.update_idletasks()
-            width, height = window.winfo_width(), window.winfo_height()
-            screen_width, screen_height = window.winfo_screenwidth(), window.winfo_screenheight()
+            if size is None:
+                window.update_idletasks()
+                size = window.winfo_width(), window.winfo_height()
+            width, height = size
+            screen_width, screen_height = _screen(window)
             x = screen_width - width - 20
             y = screen_height - height - 60
             window.geometry(f'{width}x{height}+{x}+{y}')
+            return x, y
         except Exception as e:
             logging.warning(f"Could not position window: {e}")
+            return None
 
-    def _animate_slide_in(self, window):
+    def _animate_slide_in(self, window, position=None):
         try:
-            window.update_idletasks()
-            start_x, end_x, current_y = window.winfo_screenwidth(), window.winfo_x(), window.winfo_y()
-            steps = 15
-            for i in range(steps + 1):
-                progress = 1 - (1 - (i / steps)) ** 3
-                current_x = int(start_x + (end_x - start_x) * progress)
-                window.geometry(f'+{current_x}+{current_y}')
-                window.update()
-                time.sleep(0.015)
+            if position is None:
+                window.update_idletasks()
+                position = window.winfo_x(), window.winfo_y()
+            end_x, current_y = position
+            frames = iter(_slide_xs(_screen(window)[0], end_x))
+            
+            # Each frame is scheduled on Tk's event loop instead of sleeping in it
+            def step():
+                try:
+                    current_x = next(frames, None)
+                    if current_x is None:
+                        return
+                    window.geometry(f'+{current_x}+{current_y}')
+                    window.after(15, step)
+                except tk.TclError:
+                    pass  # Window closed mid-animation
+            
+            step()
         except Exception as e:
             logging.warning(f"Animation failed: {e}")
 
@@ -242,8 +230,8 @@ class NotificationManager:
 
     def _center_on_parent(self, child, parent):
         try:
+            # The parent is already laid out and shown; only the child needs a pass
             child.update_idletasks()
-            parent.update_idletasks()
             child_width, child_height = child.winfo_width(), child.winfo_height()
             parent_x, parent_y = parent.winfo_x(), parent.winfo_y()
             parent_width, parent_height = parent.winfo_width(), parent.winfo_height()
@@ -254,7 +242,9 @@ class NotificationManager:
             logging.warning(f"Could not center dialog: {e}")
 
     @staticmethod
+    @lru_cache(maxsize=64)
     def _darken_color(color):
+        """Hover shade for a button color; the palette is small, so results are cached"""
         try:
             r, g, b = tuple(int(color.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
             return f'#{max(0, r-20):02x}{max(0, g-20):02x}{max(0, b-20):02x}'
@@ -269,15 +259,133 @@ class NotificationManager:
     @staticmethod
     def _create_rounded_rectangle(canvas, x1, y1, x2, y2, radius=25, **kwargs):
         """Draws a rounded rectangle on the canvas."""
-        points = [x1+radius, y1, x2-radius, y1,
-                  x2, y1, x2, y1+radius,
-                  x2, y2-radius, x2, y2,
-                  x2-radius, y2, x1+radius, y2,
-                  x1, y2, x1, y2-radius,
-                  x1, y1+radius, x1, y1]
+        points = [p + (y1 if i % 2 else x1)
+                  for i, p in enumerate(_rounded_points(x2-x1, y2-y1, radius))]
         return canvas.create_polygon(points, **kwargs, smooth=True, splinesteps=8)
 
 
+class ReminderDialog:
+    """Reminder popup whose widgets are built once and re-shown per reminder"""
+    
+    def __init__(self, master=None):
+        self.master = master
+        self.window = None
+        self.response = None
+        self.build()
+    
+    def build(self):
+        """Create the hidden window and the widgets shared by every reminder"""
+        window = tk.Toplevel(self.master)
+        window.withdraw()
+        window.title("")
+        window.geometry("320x140")
+        window.resizable(False, False)
+        window.overrideredirect(True)
+        
+        try:
+            window.attributes('-alpha', 0.98)
+            window.attributes('-topmost', True)
+        except tk.TclError:
+            pass
+        
+        # --- Calming UI Theme ---
+        canvas = tk.Canvas(window, highlightthickness=0, bg="#E8F5E8") # Sage green background
+        canvas.pack(fill=tk.BOTH, expand=True)
+        
+        # Gentle shadow effect by drawing a slightly larger, darker rectangle underneath
+        NotificationManager._create_rounded_rectangle(canvas, 4, 4, 316, 136, radius=12, fill="#D5DBDB")
+        
+        # Main white content card
+        bg_color = "#FFFFFF"
+        NotificationManager._create_rounded_rectangle(canvas, 2, 2, 318, 138, radius=10, fill=bg_color)
+
+        content_frame = tk.Frame(canvas, bg=bg_color)
+        content_frame.place(x=10, y=10, width=300, height=120)
+
+        header_frame = tk.Frame(content_frame, bg=bg_color, height=25)
+        header_frame.pack(fill=tk.X, pady=(0, 5))
+        header_frame.pack_propagate(False)
+        
+        app_label = tk.Label(
+            header_frame, text="Wellness Reminder", font=('Segoe UI', 9, 'bold'),
+            fg='#2D3748', bg=bg_color # Dark charcoal text
+        )
+        app_label.pack(side=tk.LEFT)
+        
+        close_btn = tk.Button(
+            header_frame, text="×", font=('Segoe UI', 12, 'bold'), fg='#718096', bg=bg_color, # Medium gray text
+            bd=0, highlightthickness=0, activebackground='#E57373', activeforeground='white',
+            cursor='hand2', command=self.close
+        )
+        close_btn.pack(side=tk.RIGHT)
+        
+        message_frame = tk.Frame(content_frame, bg=bg_color)
+        message_frame.pack(fill=tk.X, pady=(0, 8))
+        
+        self.icon_label = tk.Label(message_frame, font=('Segoe UI Emoji', 18), bg=bg_color)
+        self.icon_label.grid(row=0, column=0, sticky='n', padx=(0, 10))
+        
+        self.message_label = tk.Label(
+            message_frame, font=('Segoe UI', 10), fg='#2D3748', bg=bg_color,
+            wraplength=240, justify='left'
+        )
+        self.message_label.grid(row=0, column=1, sticky='w')
+        message_frame.grid_columnconfigure(1, weight=1)
+        
+        window.bind('<Return>', lambda e: self.close('ok'))
+        window.bind('<Escape>', lambda e: self.close('skip'))
+        
+        self.window = window
+        self.content_frame = content_frame
+        self._closed = tk.BooleanVar(window, value=True)
+        # Button rows are built once per reminder type and swapped in
+        self._button_frames = {}
+        self._active_buttons = None
+    
+    def exists(self):
+        try:
+            return self.window is not None and bool(self.window.winfo_exists())
+        except tk.TclError:
+            return False
+    
+    def set_text(self, icon, message):
+        self.icon_label.configure(text=icon)
+        self.message_label.configure(text=message)
+    
+    def set_buttons(self, reminder_type, build_buttons):
+        """Show the button row for reminder_type, building it on first use"""
+        frame = self._button_frames.get(reminder_type)
+        if frame is None:
+            frame = build_buttons(self.content_frame)
+            self._button_frames[reminder_type] = frame
+        
+        if frame is not self._active_buttons:
+            if self._active_buttons is not None:
+                self._active_buttons.pack_forget()
+            frame.pack(fill=tk.X, side=tk.BOTTOM, pady=(5, 0))
+            self._active_buttons = frame
+    
+    def show(self):
+        self.response = {'action': 'skip', 'delay_minutes': 0}
+        self._closed.set(False)
+        self.window.deiconify()
+    
+    def wait_response(self, auto_close_seconds):
+        """Run the event loop until the dialog is closed and return the response"""
+        auto_close = self.window.after(int(auto_close_seconds * 1000), self.close)
+        self.window.wait_variable(self._closed)
+        self.window.after_cancel(auto_close)
+        return self.response
+    
+    def close(self, action='skip', delay_minutes=0):
+        """Hide the dialog, keeping its widgets for the next reminder"""
+        if self._closed.get():
+            return
+        self.response = {'action': action, 'delay_minutes': delay_minutes}
+        self.window.withdraw()
+        self._closed.set(True)
+
+
 class MotivationalDialog:
     @staticmethod
     def show_motivational_message(message):
@@ -316,7 +424,7 @@ class MotivationalDialog:
             dialog.attributes('-topmost', True)
         except: pass
             
-        MotivationalDialog._position_notification_area(dialog)
+        position = MotivationalDialog._position_notification_area(dialog)
         
         canvas = tk.Canvas(dialog, highlightthickness=0, bg="#E8F5E8")
         canvas.pack(fill=tk.BOTH, expand=True)
@@ -359,19 +467,21 @@ class MotivationalDialog:
         dialog.bind('<Return>', lambda e: on_understand())
         dialog.bind('<Escape>', lambda e: on_understand())
         
-        MotivationalDialog._animate_slide_in(dialog)
+        MotivationalDialog._animate_slide_in(dialog, position)
         
-        auto_close_timer = threading.Timer(30, lambda: dialog.destroy() if dialog.winfo_exists() else None)
-        auto_close_timer.daemon = True
-        auto_close_timer.start()
+        # Scheduled on the Tk event loop so the close runs on the Tk thread
+        auto_close = dialog.after(30 * 1000, lambda: dialog.winfo_exists() and dialog.destroy())
         
         dialog.wait_window()
-        auto_close_timer.cancel()
+        try:
+            dialog.after_cancel(auto_close)
+        except tk.TclError:
+            pass  # Already fired, or gone with the window
 
     @staticmethod
     def _position_notification_area(window):
-        NotificationManager._position_notification_area(None, window)
+        return NotificationManager._position_notification_area(None, window)
 
     @staticmethod
-    def _animate_slide_in(window):
-        NotificationManager._animate_slide_in(None, window)
+    def _animate_slide_in(window, position=None):
+        NotificationManager._animate_slide_in(None, window, position)
@@ -4,132 +4,230 @@ Date/time helpers and daily reset management.
 """
 
 import logging
-from datetime import datetime, timedelta
+import os
+import platform
+import time
+from datetime import date, datetime, timedelta
 import json
+from functools import lru_cache
+from importlib.util import find_spec
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib json module
+    orjson = None
+
 # Define the base directory of the script to make paths absolute
 BASE_DIR = Path(__file__).resolve().parent
+_CONFIG_PATH = BASE_DIR / 'reminder_config.json'
+_IS_WINDOWS = platform.system().lower() == 'windows'
 
-class DateTimeUtils:
-    """Utility class for date and time operations"""
-    
-    @staticmethod
-    def get_current_date():
-        """Get current date as string"""
-        return datetime.now().strftime('%Y-%m-%d')
-    
-    @staticmethod
-    def get_current_time():
-        """Get current time as string"""
-        return datetime.now().strftime('%H:%M:%S')
-    
-    @staticmethod
-    def get_current_datetime():
-        """Get current datetime as ISO string"""
-        return datetime.now().isoformat()
+# Bound once; the date helpers run on every scheduler tick
+_now = datetime.now
+_strptime = datetime.strptime
+_combine = datetime.combine
+_FMT_DATE = '%Y-%m-%d'
+_FMT_TIME = '%H:%M:%S'
+_FMT_HM = '%H:%M'
+_ONE_DAY = timedelta(days=1)
+_ZERO_DELTA = timedelta(0)
+
+# config path -> (st_mtime_ns, st_size, parsed config, monotonic time of the
+# last stat) for load_reminder_config
+_CONFIG_CACHE = {}
+# Seconds a cached config is returned without re-checking the file
+CONFIG_STAT_SECONDS = 2
+
+# Seconds a negative should_reset() answer is reused before checking again
+RESET_CHECK_SECONDS = 30
+# (config object, result) from the last ConfigManager.validate_config call
+_LAST_VALIDATION = (None, False)
+
+def _loads(data):
+    """Parse JSON bytes, using orjson when available"""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+def _dumps_indented(data):
+    """Serialize to 2-space indented UTF-8 JSON bytes, using orjson when available"""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+def load_reminder_config(config_path=None):
+    """Parse reminder_config.json and share the result between modules
     
-    @staticmethod
-    def parse_time(time_str):
-        """Parse time string (HH:MM) to datetime object for today"""
-        try:
-            time_obj = datetime.strptime(time_str, '%H:%M').time()
-            today = datetime.now().date()
-            return datetime.combine(today, time_obj)
-        except ValueError as e:
-            logging.error(f"Error parsing time {time_str}: {e}")
-            return None
+    The parsed config is reused until the file's mtime or size changes; the
+    file is checked at most once every CONFIG_STAT_SECONDS. Callers must treat
+    the result as read-only and copy before changing it. Raises on a missing
+    or malformed file; failures are not cached.
+    """
+    if config_path is None:
+        config_path = _CONFIG_PATH
+    checked_at = time.monotonic()
+    cached = _CONFIG_CACHE.get(config_path)
+    if cached and checked_at - cached[3] < CONFIG_STAT_SECONDS:
+        return cached[2]
+    st = os.stat(config_path)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        _CONFIG_CACHE[config_path] = (cached[0], cached[1], cached[2], checked_at)
+        return cached[2]
+    with open(config_path, 'rb') as f:
+        config = _loads(f.read())
+    _CONFIG_CACHE[config_path] = (st.st_mtime_ns, st.st_size, config, checked_at)
+    return config
+
+@lru_cache(maxsize=32)
+def _parsed_time(time_str):
+    """Parse an HH:MM string once; raises ValueError like strptime"""
+    return _strptime(time_str, _FMT_HM).time()
+
+def get_current_date():
+    """Get current date as string"""
+    return _now().strftime(_FMT_DATE)
+
+def get_current_time():
+    """Get current time as string"""
+    return _now().strftime(_FMT_TIME)
+
+def get_current_datetime():
+    """Get current datetime as ISO string"""
+    return _now().isoformat()
+
+def parse_time(time_str, now=None):
+    """Parse time string (HH:MM) to datetime object for today (or now's date)"""
+    try:
+        time_obj = _parsed_time(time_str)
+        today = (now or _now()).date()
+        return _combine(today, time_obj)
+    except ValueError as e:
+        logging.error(f"Error parsing time {time_str}: {e}")
+        return None
+
+def is_new_day(last_date_str, today=None):
+    """Check if it's a new day compared to last_date_str (or a given date)"""
+    if not last_date_str:
+        return True
     
-    @staticmethod
-    def is_new_day(last_date_str):
-        """Check if it's a new day compared to last_date_str"""
-        if not last_date_str:
-            return True
+    try:
+        last_date = date.fromisoformat(last_date_str)
+        current_date = today or _now().date()
+        return current_date > last_date
+    except ValueError:
+        return True
+
+def time_until_next_occurrence(target_time_str):
+    """Calculate time until next occurrence of target time"""
+    try:
+        current_time = _now()
+        target_time = _combine(current_time.date(), _parsed_time(target_time_str))
         
-        try:
-            last_date = datetime.strptime(last_date_str, '%Y-%m-%d').date()
-            current_date = datetime.now().date()
-            return current_date > last_date
-        except ValueError:
-            return True
-    
-    @staticmethod
-    def time_until_next_occurrence(target_time_str):
-        """Calculate time until next occurrence of target time"""
-        try:
-            target_time = DateTimeUtils.parse_time(target_time_str)
-            current_time = datetime.now()
-            
-            if target_time <= current_time:
-                # If target time has passed today, schedule for tomorrow
-                target_time += timedelta(days=1)
-            
-            return target_time - current_time
-        except Exception as e:
-            logging.error(f"Error calculating time until {target_time_str}: {e}")
-            return timedelta(0)
+        if target_time <= current_time:
+            # If target time has passed today, schedule for tomorrow
+            target_time += _ONE_DAY
+        
+        return target_time - current_time
+    except Exception as e:
+        logging.error(f"Error calculating time until {target_time_str}: {e}")
+        return _ZERO_DELTA
+
+def format_duration(duration_seconds):
+    """Format duration in seconds to human readable string"""
+    if duration_seconds < 60:
+        return f"{duration_seconds:.0f} seconds"
+    elif duration_seconds < 3600:
+        minutes = duration_seconds / 60
+        return f"{minutes:.1f} minutes"
+    else:
+        hours = duration_seconds / 3600
+        return f"{hours:.1f} hours"
+
+class DateTimeUtils:
+    """Utility class for date and time operations; wraps the module-level functions"""
     
-    @staticmethod
-    def format_duration(duration_seconds):
-        """Format duration in seconds to human readable string"""
-        if duration_seconds < 60:
-            return f"{duration_seconds:.0f} seconds"
-        elif duration_seconds < 3600:
-            minutes = duration_seconds / 60
-            return f"{minutes:.1f} minutes"
-        else:
-            hours = duration_seconds / 3600
-            return f"{hours:.1f} hours"
+    get_current_date = staticmethod(get_current_date)
+    get_current_time = staticmethod(get_current_time)
+    get_current_datetime = staticmethod(get_current_datetime)
+    parse_time = staticmethod(parse_time)
+    is_new_day = staticmethod(is_new_day)
+    time_until_next_occurrence = staticmethod(time_until_next_occurrence)
+    format_duration = staticmethod(format_duration)
 
 class DailyResetManager:
     """Manages daily reset operations"""
     
     def __init__(self, db_manager):
         self.db_manager = db_manager
-        self.datetime_utils = DateTimeUtils()
+        # Timestamp of the current reset check, shared with the reset it triggers
+        self._now = None
+        # (monotonic time, date) of the last should_reset() that found no reset due
+        self._last_check = None
+    
+    def _tick(self, now=None):
+        """Start a reset cycle at now (default: the current time)"""
+        self._now = now or _now()
+        return self._now
     
-    def should_reset(self):
+    def should_reset(self, now=None):
         """Check if daily reset should be performed"""
         try:
+            # The answer can only flip when the date changes, so a recent
+            # "no" from the same day still holds
+            check_ts = time.monotonic()
+            now = self._tick(now)
+            today = now.date()
+            if (self._last_check is not None and self._last_check[1] == today
+                    and check_ts - self._last_check[0] < RESET_CHECK_SECONDS):
+                self._now = None
+                return False
+            
             last_reset_date = self.db_manager.get_setting('last_reset_date')
-            return self.datetime_utils.is_new_day(last_reset_date)
+            if is_new_day(last_reset_date, today=today):
+                self._last_check = None
+                return True
+            self._now = None
+            self._last_check = (check_ts, today)
+            return False
         except Exception as e:
             logging.error(f"Error checking if reset needed: {e}")
             return False
     
-    def perform_daily_reset(self):
+    def perform_daily_reset(self, now=None):
         """Perform daily reset operations"""
         try:
-            current_date = self.datetime_utils.get_current_date()
+            # Reuse the timestamp from should_reset() when it started this cycle
+            now = now or self._now or self._tick()
+            self._now = None
+            self._last_check = None
+            current_date = now.strftime(_FMT_DATE)
+            yesterday = (now.date() - _ONE_DAY).isoformat()
             
             logging.info("Starting daily reset...")
             
-            # Archive old data before clearing
-            self._archive_previous_day_summary()
-            
-            # Clear today's data (in case of multiple resets)
-            self.db_manager.clear_daily_data()
-            
-            # Archive old data based on retention policy
-            self._cleanup_old_data()
-            
-            # Update last reset date
-            self.db_manager.update_settings('last_reset_date', current_date)
+            # One flush covers the clear, the cleanup and the settings update
+            with self.db_manager.batch():
+                # Take yesterday's summary and clear today's data (in case of
+                # multiple resets) in one call
+                summary = self.db_manager.archive_and_clear(yesterday, current_date)
+                self._archive_previous_day_summary(yesterday, summary)
+                
+                # Archive old data based on retention policy
+                self._cleanup_old_data()
+                
+                # Update last reset date
+                self.db_manager.update_settings('last_reset_date', current_date)
             
             logging.info(f"Daily reset completed for {current_date}")
             
         except Exception as e:
             logging.error(f"Error performing daily reset: {e}")
     
-    def _archive_previous_day_summary(self):
-        """Archive previous day's summary before reset"""
+    def _archive_previous_day_summary(self, yesterday, summary):
+        """Log the previous day's summary taken during the reset"""
         try:
-            yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-            summary = self.db_manager.get_daily_summary(yesterday)
-            
             if summary:
                 # Log summary for reference
-                logging.info(f"Previous day ({yesterday}) summary: {len(summary)} task types tracked")
+                logging.info("Previous day (%s) summary: %d task types tracked", yesterday, len(summary))
                 
                 for task_summary in summary:
                     task_name = task_summary.get('task_name', 'unknown')
@@ -141,9 +239,8 @@ class DailyResetManager:
                     completion_rate = (ok_count / total * 100) if total > 0 else 0
                     
                     logging.info(
-                        f"  {task_name}: {total} reminders, "
-                        f"{ok_count} completed ({completion_rate:.1f}%), "
-                        f"{skip_count} skipped, {busy_count} delayed"
+                        "  %s: %d reminders, %d completed (%.1f%%), %d skipped, %d delayed",
+                        task_name, total, ok_count, completion_rate, skip_count, busy_count
                     )
             
         except Exception as e:
@@ -165,10 +262,8 @@ class DailyResetManager:
     def _get_retention_days(self):
         """Get data retention days from configuration"""
         try:
-            # Use absolute path for the config file
-            with open(BASE_DIR / 'reminder_config.json', 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                return config.get('settings', {}).get('data_retention_days', 30)
+            config = ConfigManager.load_config()
+            return config.get('settings', {}).get('data_retention_days', 30)
         except Exception as e:
             logging.warning(f"Could not load retention policy: {e}")
             return 30  # Default to 30 days
@@ -178,27 +273,35 @@ class ConfigManager:
     
     @staticmethod
     def load_config(config_path=None):
-        """Load configuration from file"""
+        """Load configuration from file
+        
+        Shares load_reminder_config's cache, so callers must copy the result
+        before changing it.
+        """
         if config_path is None:
-            config_path = BASE_DIR / 'reminder_config.json'
+            config_path = _CONFIG_PATH
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_reminder_config(config_path)
         except FileNotFoundError:
             logging.error(f"Configuration file {config_path} not found")
             return None
-        except json.JSONDecodeError as e:
+        except ValueError as e:
+            # json.JSONDecodeError and orjson.JSONDecodeError both subclass ValueError
             logging.error(f"Error parsing configuration file: {e}")
             return None
     
     @staticmethod
     def save_config(config, config_path=None):
         """Save configuration to file"""
+        global _LAST_VALIDATION
         if config_path is None:
-            config_path = BASE_DIR / 'reminder_config.json'
+            config_path = _CONFIG_PATH
         try:
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            with open(config_path, 'wb') as f:
+                f.write(_dumps_indented(config))
+            _CONFIG_CACHE.pop(config_path, None)
+            # The saved object may have been changed since it was validated
+            _LAST_VALIDATION = (None, False)
             logging.info(f"Configuration saved to {config_path}")
             return True
         except Exception as e:
@@ -207,7 +310,20 @@ class ConfigManager:
     
     @staticmethod
     def validate_config(config):
-        """Validate configuration structure"""
+        """Validate configuration structure
+        
+        Revalidating the same config object returns the previous result;
+        load_config hands out a new object whenever the file changes.
+        """
+        global _LAST_VALIDATION
+        if config is not None and _LAST_VALIDATION[0] is config:
+            return _LAST_VALIDATION[1]
+        result = ConfigManager._check_config(config)
+        _LAST_VALIDATION = (config, result)
+        return result
+    
+    @staticmethod
+    def _check_config(config):
         required_sections = ['reminders', 'settings']
         required_reminder_fields = ['message', 'enabled']
         
@@ -250,13 +366,12 @@ class SystemUtils:
     @staticmethod
     def is_windows():
         """Check if running on Windows"""
-        import platform
-        return platform.system().lower() == 'windows'
+        return _IS_WINDOWS
     
     @staticmethod
+    @lru_cache(maxsize=1)
     def get_system_info():
-        """Get basic system information"""
-        import platform
+        """Get basic system information (fixed for the process, so computed once)"""
         return {
             'system': platform.system(),
             'version': platform.version(),
@@ -267,11 +382,11 @@ class SystemUtils:
     @staticmethod
     def create_directories(directories):
         """Create directories if they don't exist"""
-        from pathlib import Path
-        
         for directory in directories:
             try:
-                Path(directory).mkdir(parents=True, exist_ok=True)
+                # A single stat covers the common case of an existing directory
+                if not os.path.isdir(directory):
+                    os.makedirs(directory, exist_ok=True)
                 logging.info(f"Directory created/verified: {directory}")
             except Exception as e:
                 logging.error(f"Error creating directory {directory}: {e}")
@@ -279,13 +394,12 @@ class SystemUtils:
     @staticmethod
     def check_dependencies():
         """Check if required dependencies are available"""
-        required_modules = ['schedule', 'tinydb', 'tkinter']
+        required_modules = ['tinydb', 'tkinter']
         missing_modules = []
         
+        # find_spec only locates the module; importing tkinter would start Tcl
         for module in required_modules:
-            try:
-                __import__(module)
-            except ImportError:
+            if find_spec(module) is None:
                 missing_modules.append(module)
         
         if missing_modules: